@@ -0,0 +1,84 @@
+import bisect
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Union
+
+
+DEFAULT_TOLERANCES = {
+    'avg_cpu_load_5m': 0.25,
+    'cpu_percent': 5.0,
+    'ram_percent_used': 5.0,
+    'battery_level': 5.0,
+    'is_charging': 1.0,
+    'idle_time_sec': (60.0, 300.0, 1800.0),
+    'last_job_success': 1.0,
+    'time_of_day': 1.0
+}
+
+
+class PredictionCache:
+    
+    def __init__(self, feature_columns: List[str], max_entries: int = 1024, ttl_sec: float = 300.0,
+                 tolerances: Optional[Dict[str, Union[float, Sequence[float]]]] = None):
+        self.feature_columns = feature_columns
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        
+        merged = dict(DEFAULT_TOLERANCES)
+        merged.update(tolerances or {})
+        self.tolerances = [merged.get(column, 1.0) for column in feature_columns]
+        
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def key(self, row: Sequence[float]) -> tuple:
+        return tuple(
+            self._quantize(value, tolerance) for value, tolerance in zip(row, self.tolerances)
+        )
+    
+    @staticmethod
+    def _quantize(value: float, tolerance) -> float:
+        if isinstance(tolerance, (tuple, list)):
+            return bisect.bisect_right(tolerance, value)
+        if tolerance > 0:
+            return math.floor(value / tolerance)
+        return value
+    
+    def get(self, key: tuple, now: Optional[float] = None) -> Optional[float]:
+        now = time.time() if now is None else now
+        entry = self._entries.get(key)
+        
+        if entry is None or now - entry[0] > self.ttl_sec:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def put(self, key: tuple, value: float, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self._entries[key] = (now, value)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None
+        }
@@ -0,0 +1,118 @@
+import numpy as np
+from typing import List
+
+
+class CompiledForest:
+    
+    def __init__(self, children_left: np.ndarray, children_right: np.ndarray, feature: np.ndarray,
+                 threshold: np.ndarray, value: np.ndarray, roots: np.ndarray, max_depth: int,
+                 classes: np.ndarray, n_features: int):
+        self.children_left = children_left
+        self.children_right = children_right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.n_features = int(n_features)
+    
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+    
+    @classmethod
+    def from_sklearn(cls, forest) -> "CompiledForest":
+        lefts: List[np.ndarray] = []
+        rights: List[np.ndarray] = []
+        features: List[np.ndarray] = []
+        thresholds: List[np.ndarray] = []
+        values: List[np.ndarray] = []
+        roots = []
+        max_depth = 0
+        offset = 0
+        
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.int32)
+            is_leaf = tree.children_left < 0
+            
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left).astype(np.int32) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right).astype(np.int32) + offset)
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            
+            node_values = tree.value[:, 0, :].astype(np.float64)
+            totals = node_values.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1.0
+            values.append(node_values / totals)
+            
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += tree.node_count
+        
+        return cls(
+            children_left=np.concatenate(lefts),
+            children_right=np.concatenate(rights),
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.int32),
+            max_depth=max_depth,
+            classes=np.asarray(forest.classes_),
+            n_features=forest.n_features_in_
+        )
+    
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                children_left=self.children_left,
+                children_right=self.children_right,
+                feature=self.feature,
+                threshold=self.threshold,
+                value=self.value,
+                roots=self.roots,
+                max_depth=np.array(self.max_depth),
+                classes=self.classes_,
+                n_features=np.array(self.n_features)
+            )
+    
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                children_left=data["children_left"],
+                children_right=data["children_right"],
+                feature=data["feature"],
+                threshold=data["threshold"],
+                value=data["value"],
+                roots=data["roots"],
+                max_depth=int(data["max_depth"]),
+                classes=data["classes"],
+                n_features=int(data["n_features"])
+            )
+    
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected input with {self.n_features} features, got shape {X.shape}")
+        
+        nodes = np.tile(self.roots, (X.shape[0], 1))
+        rows = np.arange(X.shape[0])[:, None]
+        
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        
+        return nodes
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+        
+        proba = np.zeros((leaves.shape[0], self.value.shape[1]), dtype=np.float64)
+        for tree_index in range(self.n_trees):
+            proba += self.value[leaves[:, tree_index]]
+        proba /= self.n_trees
+        
+        return proba
@@ -1,13 +1,29 @@
-import joblib
 import numpy as np
 import os
-from typing import Dict, Optional, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from smartcron.ai.cache import PredictionCache
+from smartcron.ai.compiled import CompiledForest
+from smartcron.ai.registry import ModelRegistry
+
+
+LONG_JOB_SEC = 600
+LOAD_SPIKE_RATIO = 1.2
+LOAD_SPIKE_MIN_PER_CORE = 0.7
+LOAD_SPIKE_PENALTY = 0.3
+RECENT_FAILURE_RATE = 0.5
+RECENT_FAILURE_PENALTY = 0.1
+STALE_SUCCESS_SEC = 86400
+STALE_SUCCESS_BONUS = 0.1
+
 
 class AIPredictor:
     
-    def __init__(self, model_path: str = "models/model.pkl"):
+    def __init__(self, model_path: str = "models/model.pkl", cache_size: int = 1024,
+                 cache_ttl: float = 300.0, cache_tolerances: Optional[Dict[str, float]] = None,
+                 job_model_dir: Optional[str] = None, max_job_models: int = 8):
         self.model_path = model_path
         self.model = None
         self.feature_columns = [
@@ -21,52 +37,234 @@ class AIPredictor:
             'time_of_day'
         ]
         
+        self.cache = None
+        if cache_size > 0:
+            self.cache = PredictionCache(self.feature_columns, cache_size, cache_ttl, cache_tolerances)
+        
+        self.registry = None
+        if max_job_models > 0:
+            if job_model_dir is None:
+                job_model_dir = os.path.join(os.path.dirname(model_path), 'jobs')
+            self.registry = ModelRegistry(job_model_dir, max_job_models)
+        
         self._load_model()
     
-    def _load_model(self):
-        if os.path.exists(self.model_path):
+    def _compiled_model_path(self) -> str:
+        if self.model_path.endswith('.npz'):
+            return self.model_path
+        return os.path.splitext(self.model_path)[0] + '.npz'
+    
+    def _model_signature(self) -> tuple:
+        return tuple(
+            os.path.getmtime(path) if os.path.exists(path) else None
+            for path in (self.model_path, self._compiled_model_path())
+        )
+    
+    def _read_model(self):
+        compiled_path = self._compiled_model_path()
+        if os.path.exists(compiled_path) and (
+            compiled_path == self.model_path
+            or not os.path.exists(self.model_path)
+            or os.path.getmtime(compiled_path) >= os.path.getmtime(self.model_path)
+        ):
             try:
-                self.model = joblib.load(self.model_path)
+                model = CompiledForest.load(compiled_path)
+                print(f"AI model loaded from {compiled_path}")
+                return model
+            except Exception as e:
+                print(f"Error loading compiled model: {e}")
+        
+        if compiled_path != self.model_path and os.path.exists(self.model_path):
+            try:
+                import joblib
+                model = joblib.load(self.model_path)
                 print(f"AI model loaded from {self.model_path}")
+                return model
             except Exception as e:
                 print(f"Error loading model: {e}")
-                self.model = None
-        else:
-            print(f"Model not found at {self.model_path}. AI predictions will use fallback logic.")
-            self.model = None
+                return None
+        
+        print(f"Model not found at {self.model_path}. AI predictions will use fallback logic.")
+        return None
     
-    def prepare_features(self, system_metrics: Dict, job_info: Dict) -> np.ndarray:
+    def _load_model(self):
+        self._loaded_signature = self._model_signature()
+        self.model = self._read_model()
+        if self.cache is not None:
+            self.cache.clear()
+    
+    def reload_if_changed(self) -> bool:
+        if self.registry is not None and self.registry.reload_if_changed() and self.cache is not None:
+            self.cache.clear()
+        
+        signature = self._model_signature()
+        if signature == self._loaded_signature:
+            return False
+        
+        self._loaded_signature = signature
+        model = self._read_model()
+        if model is None and self.model is not None:
+            print("Keeping previously loaded AI model")
+            return False
+        
+        self.model = model
+        if self.cache is not None:
+            self.cache.clear()
+        return True
+    
+    def _system_features(self, system_metrics: Dict) -> Dict[str, float]:
         from datetime import datetime
         
-        features = {
+        return {
             'avg_cpu_load_5m': system_metrics.get('cpu', {}).get('load_5m', 0),
             'cpu_percent': system_metrics.get('cpu', {}).get('cpu_percent', 0),
             'ram_percent_used': system_metrics.get('memory', {}).get('percent', 0),
             'battery_level': system_metrics.get('battery', {}).get('percent', 100) if system_metrics.get('battery') else 100,
             'is_charging': int(system_metrics.get('battery', {}).get('is_charging', True)) if system_metrics.get('battery') else 1,
             'idle_time_sec': system_metrics.get('idle_time_sec', 0) or 0,
-            'last_job_success': int(job_info.get('last_job_success', 1)),
+            'last_job_success': 1,
             'time_of_day': datetime.now().hour
         }
+    
+    def prepare_features(self, system_metrics: Dict, job_info: Dict) -> np.ndarray:
+        return self.prepare_features_batch(system_metrics, [job_info])
+    
+    def prepare_features_batch(self, system_metrics: Dict, job_infos: List[Dict]) -> np.ndarray:
+        features = self._system_features(system_metrics)
+        base_row = np.array([features[col] for col in self.feature_columns], dtype=np.float64)
         
-        feature_array = np.array([[features[col] for col in self.feature_columns]])
-        return feature_array
+        feature_matrix = np.tile(base_row, (len(job_infos), 1))
+        success_column = self.feature_columns.index('last_job_success')
+        feature_matrix[:, success_column] = [int(info.get('last_job_success', 1)) for info in job_infos]
+        
+        return feature_matrix
+    
+    @staticmethod
+    def _predicts_load_spike(system_metrics: Dict, job_info: Dict) -> bool:
+        expected_runtime = job_info.get('p95_execution_time') or job_info.get('avg_execution_time', 60)
+        if expected_runtime < LONG_JOB_SEC:
+            return False
+        
+        cpu = system_metrics.get('cpu', {})
+        load_1m = cpu.get('load_1m', 0) or 0
+        load_5m = cpu.get('load_5m', 0) or 0
+        cores = os.cpu_count() or 1
+        
+        return load_1m > load_5m * LOAD_SPIKE_RATIO and load_1m / cores >= LOAD_SPIKE_MIN_PER_CORE
+    
+    @staticmethod
+    def _success_probabilities(model, proba: np.ndarray) -> np.ndarray:
+        classes = list(getattr(model, 'classes_', [0, 1]))
+        if 1 not in classes:
+            return np.zeros(proba.shape[0])
+        return proba[:, classes.index(1)]
+    
+    def _model_probabilities(self, model, features: np.ndarray, scope: Optional[str] = None) -> np.ndarray:
+        if self.cache is None:
+            return self._success_probabilities(model, model.predict_proba(features))
+        
+        now = time.time()
+        prefix = (scope,) if scope is not None else ()
+        keys = [prefix + self.cache.key(row) for row in features]
+        probabilities = np.empty(len(keys))
+        
+        missing = {}
+        for index, key in enumerate(keys):
+            cached = self.cache.get(key, now)
+            if cached is None:
+                missing.setdefault(key, []).append(index)
+            else:
+                probabilities[index] = cached
+        
+        if missing:
+            rows = [indices[0] for indices in missing.values()]
+            evaluated = self._success_probabilities(model, model.predict_proba(features[rows]))
+            for (key, indices), probability in zip(missing.items(), evaluated):
+                probabilities[indices] = probability
+                self.cache.put(key, float(probability), now)
+        
+        return probabilities
+    
+    def _group_by_model(self, job_infos: List[Dict]) -> Dict[Optional[str], Tuple[any, List[int]]]:
+        groups = {}
+        for index, job_info in enumerate(job_infos):
+            job_name = job_info.get('job_name')
+            job_model = self.registry.get(job_name) if self.registry is not None and job_name else None
+            
+            if job_model is not None:
+                groups.setdefault(job_name, (job_model, []))[1].append(index)
+            elif self.model is not None:
+                groups.setdefault(None, (self.model, []))[1].append(index)
+        
+        return groups
+    
+    def job_model_stats(self) -> Optional[Dict[str, any]]:
+        return self.registry.stats() if self.registry is not None else None
+    
+    def cache_stats(self) -> Optional[Dict[str, any]]:
+        return self.cache.stats() if self.cache is not None else None
     
     def predict(self, system_metrics: Dict, job_info: Dict) -> Tuple[float, str]:
-        features = self.prepare_features(system_metrics, job_info)
+        return self.predict_batch(system_metrics, [job_info])[0]
+    
+    def predict_batch(self, system_metrics: Dict, job_infos: List[Dict]) -> List[Tuple[float, str]]:
+        if not job_infos:
+            return []
         
-        if self.model is not None:
-            try:
-                probability = self.model.predict_proba(features)[0][1]
-                
-                decision_reason = f"AI model predicts {probability:.2%} success probability"
-                
-                return probability, decision_reason
-            except Exception as e:
-                print(f"Error during prediction: {e}")
-                return self._fallback_prediction(system_metrics, job_info)
-        else:
-            return self._fallback_prediction(system_metrics, job_info)
+        predictions = [None] * len(job_infos)
+        
+        try:
+            groups = self._group_by_model(job_infos)
+            if groups:
+                features = self.prepare_features_batch(system_metrics, job_infos)
+            for scope, (model, indices) in groups.items():
+                probabilities = self._model_probabilities(model, features[indices], scope)
+                for index, probability in zip(indices, probabilities):
+                    predictions[index] = self._model_prediction(
+                        float(probability), scope, system_metrics, job_infos[index]
+                    )
+        except Exception as e:
+            print(f"Error during prediction: {e}")
+            predictions = [None] * len(job_infos)
+        
+        return [
+            prediction if prediction is not None else self._fallback_prediction(system_metrics, job_info)
+            for prediction, job_info in zip(predictions, job_infos)
+        ]
+    
+    def _model_prediction(self, probability: float, scope: Optional[str], system_metrics: Dict,
+                          job_info: Dict) -> Tuple[float, str]:
+        decision_reason = f"AI model predicts {probability:.2%} success probability"
+        if scope is not None:
+            decision_reason += " (per-job model)"
+        
+        adjustment, reasons = self._history_adjustment(job_info)
+        if self._predicts_load_spike(system_metrics, job_info):
+            adjustment -= LOAD_SPIKE_PENALTY
+            reasons.append("load rising before a long job")
+        
+        if reasons:
+            probability = max(0.0, min(1.0, probability + adjustment))
+            decision_reason += ", " + ", ".join(reasons)
+        
+        return probability, decision_reason
+    
+    @staticmethod
+    def _history_adjustment(job_info: Dict) -> Tuple[float, List[str]]:
+        adjustment = 0.0
+        reasons = []
+        
+        recent_failure_rate = job_info.get('recent_failure_rate')
+        if recent_failure_rate is not None and recent_failure_rate >= RECENT_FAILURE_RATE:
+            adjustment -= RECENT_FAILURE_PENALTY
+            reasons.append("frequent recent failures")
+        
+        time_since_last_success = job_info.get('time_since_last_success')
+        if time_since_last_success is not None and time_since_last_success >= STALE_SUCCESS_SEC:
+            adjustment += STALE_SUCCESS_BONUS
+            reasons.append("no success in over a day")
+        
+        return adjustment, reasons
     
     def _fallback_prediction(self, system_metrics: Dict, job_info: Dict) -> Tuple[float, str]:
         score = 1.0
@@ -106,15 +304,22 @@ class AIPredictor:
             score -= 0.2
             reasons.append("previous job failed")
         
+        adjustment, history_reasons = self._history_adjustment(job_info)
+        score += adjustment
+        reasons.extend(history_reasons)
+        
+        if self._predicts_load_spike(system_metrics, job_info):
+            score -= LOAD_SPIKE_PENALTY
+            reasons.append("load rising before a long job")
+        
         score = max(0.0, min(1.0, score))
         
         decision_reason = "Fallback heuristic: " + ", ".join(reasons) if reasons else "Fallback heuristic: conditions are good"
         
         return score, decision_reason
     
-    def get_decision_score(self, system_metrics: Dict, job_info: Dict) -> Dict[str, any]:
-        probability, reason = self.predict(system_metrics, job_info)
-        
+    @staticmethod
+    def _decision_from_probability(probability: float, reason: str, job_info: Dict) -> Dict[str, any]:
         if probability >= 0.8:
             decision = "run_now"
         elif probability >= 0.5:
@@ -128,4 +333,13 @@ class AIPredictor:
             "reason": reason,
             "expected_runtime": job_info.get('avg_execution_time', 60)
         }
-
+    
+    def get_decision_score(self, system_metrics: Dict, job_info: Dict) -> Dict[str, any]:
+        return self.get_decision_scores(system_metrics, [job_info])[0]
+    
+    def get_decision_scores(self, system_metrics: Dict, job_infos: List[Dict]) -> List[Dict[str, any]]:
+        predictions = self.predict_batch(system_metrics, job_infos)
+        return [
+            self._decision_from_probability(probability, reason, job_info)
+            for (probability, reason), job_info in zip(predictions, job_infos)
+        ]
@@ -0,0 +1,86 @@
+import os
+from collections import OrderedDict
+from typing import Dict
+
+from smartcron.ai.compiled import CompiledForest
+from smartcron.utils.paths import safe_filename
+
+
+def job_model_path(model_dir: str, job_name: str, extension: str = '.pkl') -> str:
+    return os.path.join(model_dir, safe_filename(job_name) + extension)
+
+
+class ModelRegistry:
+    
+    def __init__(self, model_dir: str, max_loaded: int = 8):
+        self.model_dir = model_dir
+        self.max_loaded = max_loaded
+        self._models = OrderedDict()
+        self._missing = set()
+        self.loads = 0
+        self.evictions = 0
+    
+    def _signature(self, job_name: str) -> tuple:
+        return tuple(
+            os.path.getmtime(path) if os.path.exists(path) else None
+            for path in (job_model_path(self.model_dir, job_name, '.npz'),
+                         job_model_path(self.model_dir, job_name, '.pkl'))
+        )
+    
+    def _read(self, job_name: str, signature: tuple):
+        compiled_mtime, pickle_mtime = signature
+        
+        if compiled_mtime is not None and (pickle_mtime is None or compiled_mtime >= pickle_mtime):
+            try:
+                return CompiledForest.load(job_model_path(self.model_dir, job_name, '.npz'))
+            except Exception as e:
+                print(f"Error loading compiled model for job {job_name}: {e}")
+        
+        if pickle_mtime is not None:
+            try:
+                import joblib
+                return joblib.load(job_model_path(self.model_dir, job_name, '.pkl'))
+            except Exception as e:
+                print(f"Error loading model for job {job_name}: {e}")
+        
+        return None
+    
+    def get(self, job_name: str):
+        entry = self._models.get(job_name)
+        if entry is not None:
+            self._models.move_to_end(job_name)
+            return entry[1]
+        
+        if job_name in self._missing:
+            return None
+        
+        signature = self._signature(job_name)
+        model = self._read(job_name, signature) if signature != (None, None) else None
+        if model is None:
+            self._missing.add(job_name)
+            return None
+        
+        self._models[job_name] = (signature, model)
+        self.loads += 1
+        while len(self._models) > self.max_loaded:
+            self._models.popitem(last=False)
+            self.evictions += 1
+        
+        return model
+    
+    def reload_if_changed(self) -> bool:
+        self._missing.clear()
+        
+        changed = [job_name for job_name, (signature, _) in self._models.items()
+                   if self._signature(job_name) != signature]
+        for job_name in changed:
+            del self._models[job_name]
+        
+        return bool(changed)
+    
+    def stats(self) -> Dict[str, any]:
+        return {
+            "loaded": list(self._models),
+            "loads": self.loads,
+            "evictions": self.evictions
+        }
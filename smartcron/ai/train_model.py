@@ -3,10 +3,41 @@ import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
+from sklearn.utils.class_weight import compute_class_weight
 import joblib
+import json
 import sqlite3
 import os
-from typing import Optional
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from smartcron.ai.compiled import CompiledForest
+from smartcron.ai.registry import job_model_path
+from smartcron.utils.logger import (
+    JOB_EXECUTION_INSERT, JOB_OUTPUT_INSERT, JOB_STATS_INSERT, STATE_FEATURE_COLUMNS,
+    encode_output, migrate, state_features
+)
+from smartcron.utils.stats import JobStats
+
+
+DEFAULT_CHUNK_SIZE = 50000
+DEFAULT_SYNTHETIC_WINDOW_DAYS = 365
+
+DEFAULT_JOB_SPEC = {
+    'weight': 1.0,
+    'runtime_sec': 30.0,
+    'runtime_sigma': 0.0,
+    'base_success': 0.9
+}
+
+DEFAULT_JOB_MIX = {
+    'synthetic_job': DEFAULT_JOB_SPEC
+}
+
+STATE_TEMPLATE = (
+    '{"timestamp": %.3f, "cpu": {"load_5m": %.2f, "cpu_percent": %.1f}, "memory": {"percent": %.1f}, '
+    '"battery": {"percent": %.1f, "is_charging": %s}, "idle_time_sec": %d}'
+)
 
 
 class ModelTrainer:
@@ -14,6 +45,7 @@ class ModelTrainer:
     def __init__(self, db_path: str = "/var/lib/smartcron/logs.db"):
         self.db_path = db_path
         self.model = None
+        self.watermark = None
         self.feature_columns = [
             'avg_cpu_load_5m',
             'cpu_percent',
@@ -25,65 +57,182 @@ class ModelTrainer:
             'time_of_day'
         ]
     
-    def load_training_data(self) -> pd.DataFrame:
-        conn = sqlite3.connect(self.db_path)
+    def _training_query(self, since_id: Optional[int], start_time: Optional[float],
+                        end_time: Optional[float], job_names: Optional[List[str]]) -> Tuple[str, list]:
+        conditions = ["je.system_state IS NOT NULL", "je.id > ?"]
+        params = [since_id or 0]
+        
+        if start_time is not None:
+            conditions.append("je.start_time >= ?")
+            params.append(start_time)
+        if end_time is not None:
+            conditions.append("je.start_time < ?")
+            params.append(end_time)
+        if job_names:
+            conditions.append(f"je.job_name IN ({', '.join('?' for _ in job_names)})")
+            params.extend(job_names)
         
-        query = """
+        query = f"""
             SELECT 
+                je.id,
                 je.job_name,
                 je.start_time,
                 je.success,
-                je.system_state,
-                je.execution_time_sec
+                je.execution_time_sec,
+                {", ".join("je." + column for column in STATE_FEATURE_COLUMNS)},
+                CASE WHEN je.cpu_percent IS NULL THEN je.system_state END AS system_state
             FROM job_executions je
-            WHERE je.system_state IS NOT NULL
+            WHERE {" AND ".join(conditions)}
+            ORDER BY je.id
         """
+        return query, params
+    
+    def iter_training_data(self, since_id: Optional[int] = None, start_time: Optional[float] = None,
+                           end_time: Optional[float] = None, job_names: Optional[List[str]] = None,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            migrate(conn)
+            query, params = self._training_query(since_id, start_time, end_time, job_names)
+            for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunk_size):
+                yield chunk
+        finally:
+            conn.close()
+    
+    def load_training_data(self, since_id: Optional[int] = None, start_time: Optional[float] = None,
+                           end_time: Optional[float] = None,
+                           job_names: Optional[List[str]] = None,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+        chunks = list(self.iter_training_data(since_id, start_time, end_time, job_names, chunk_size))
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+    
+    def load_training_features(self, since_id: Optional[int] = None, start_time: Optional[float] = None,
+                               end_time: Optional[float] = None, job_names: Optional[List[str]] = None,
+                               chunk_size: int = DEFAULT_CHUNK_SIZE, sample_fraction: Optional[float] = None,
+                               max_samples: Optional[int] = None,
+                               random_state: int = 42) -> Tuple[pd.DataFrame, Optional[int]]:
+        rng = np.random.default_rng(random_state)
+        columns = self.feature_columns + ['success']
+        previous = {}
+        parts = []
+        reservoir = np.empty((0, len(columns)))
+        seen = 0
+        last_id = None
         
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        
-        return df
-    
-    def prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        import json
-        
-        features = []
-        
-        for idx, row in df.iterrows():
-            try:
-                system_state = json.loads(row['system_state'])
-                
-                feature_dict = {
-                    'avg_cpu_load_5m': system_state.get('cpu', {}).get('load_5m', 0),
-                    'cpu_percent': system_state.get('cpu', {}).get('cpu_percent', 0),
-                    'ram_percent_used': system_state.get('memory', {}).get('percent', 0),
-                    'battery_level': system_state.get('battery', {}).get('percent', 100) if system_state.get('battery') else 100,
-                    'is_charging': int(system_state.get('battery', {}).get('is_charging', True)) if system_state.get('battery') else 1,
-                    'idle_time_sec': system_state.get('idle_time_sec', 0) or 0,
-                    'last_job_success': 1,
-                    'time_of_day': pd.to_datetime(row['start_time'], unit='s').hour,
-                    'success': int(row['success'])
-                }
-                
-                features.append(feature_dict)
-            except (json.JSONDecodeError, KeyError) as e:
+        for chunk in self.iter_training_data(since_id, start_time, end_time, job_names, chunk_size):
+            if chunk.empty:
                 continue
+            last_id = int(chunk['id'].max())
+            features = self.prepare_features(chunk, previous)
+            
+            if sample_fraction is not None and sample_fraction < 1:
+                features = features[rng.random(len(features)) < sample_fraction]
+            
+            if max_samples is None:
+                parts.append(features)
+            else:
+                reservoir, seen = self._reservoir_update(
+                    reservoir, features[columns].to_numpy(np.float64), seen, max_samples, rng
+                )
+        
+        if max_samples is not None:
+            features = pd.DataFrame(reservoir, columns=columns)
+            features = features.astype({'is_charging': int, 'last_job_success': int, 'success': int})
+        elif parts:
+            features = pd.concat(parts, ignore_index=True)
+        else:
+            features = pd.DataFrame(columns=columns)
         
-        return pd.DataFrame(features)
+        return features, last_id
     
-    def train(self, test_size: float = 0.2, random_state: int = 42):
-        df = self.load_training_data()
+    @staticmethod
+    def _reservoir_update(reservoir: np.ndarray, rows: np.ndarray, seen: int, capacity: int,
+                          rng: np.random.Generator) -> Tuple[np.ndarray, int]:
+        fill = min(max(capacity - len(reservoir), 0), len(rows))
+        if fill:
+            reservoir = np.vstack([reservoir, rows[:fill]])
         
-        if len(df) < 10:
-            print(f"Not enough training data: {len(df)} records. Need at least 10.")
-            return None
+        rest = rows[fill:]
+        if len(rest):
+            positions = seen + fill + np.arange(1, len(rest) + 1)
+            slots = (rng.random(len(rest)) * positions).astype(np.int64)
+            keep = slots < capacity
+            slots, rest = slots[keep], rest[keep]
+            
+            _, last = np.unique(slots[::-1], return_index=True)
+            chosen = len(slots) - 1 - last
+            reservoir[slots[chosen]] = rest[chosen]
+        
+        return reservoir, seen + len(rows)
+    
+    @staticmethod
+    def _parse_state_features(system_state: str) -> tuple:
+        try:
+            return state_features(json.loads(system_state))
+        except (ValueError, TypeError, AttributeError):
+            return (np.nan,) * len(STATE_FEATURE_COLUMNS)
+    
+    def _state_feature_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        columns = list(STATE_FEATURE_COLUMNS)
+        if set(columns).issubset(df.columns):
+            features = df[columns].apply(pd.to_numeric, errors='coerce')
+        else:
+            features = pd.DataFrame(np.nan, columns=columns, index=df.index)
         
-        features_df = self.prepare_features(df)
+        if 'system_state' in df.columns:
+            legacy = features['cpu_percent'].isna() & df['system_state'].notna()
+            if legacy.any():
+                rows = [self._parse_state_features(state) for state in df.loc[legacy, 'system_state']]
+                features.loc[legacy, columns] = np.array(rows, dtype=np.float64)
         
-        if len(features_df) == 0:
-            print("No valid features could be extracted from training data.")
+        return features
+    
+    def prepare_features(self, df: pd.DataFrame, previous: Optional[Dict[str, int]] = None) -> pd.DataFrame:
+        if len(df) == 0:
+            return pd.DataFrame(columns=self.feature_columns + ['success'])
+        
+        features = self._state_feature_frame(df)
+        success = pd.to_numeric(df['success'], errors='coerce')
+        
+        ordered = success.loc[df.sort_values('start_time', kind='stable').index]
+        last_success = ordered.groupby(df['job_name']).shift(1)
+        if previous:
+            last_success = last_success.fillna(df['job_name'].map(previous))
+        
+        features['last_job_success'] = last_success.fillna(1)
+        if previous is not None:
+            previous.update(ordered.groupby(df['job_name']).last().dropna().astype(int).to_dict())
+        
+        features['time_of_day'] = pd.to_datetime(df['start_time'], unit='s').dt.hour
+        features['success'] = success
+        
+        features = features.dropna()[self.feature_columns + ['success']]
+        features = features.astype({'is_charging': int, 'last_job_success': int, 'success': int})
+        return features.reset_index(drop=True)
+    
+    def train(self, test_size: float = 0.2, random_state: int = 42, start_time: Optional[float] = None,
+              end_time: Optional[float] = None, job_names: Optional[List[str]] = None,
+              sample_fraction: Optional[float] = None, max_samples: Optional[int] = None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE):
+        features_df, last_id = self.load_training_features(
+            start_time=start_time,
+            end_time=end_time,
+            job_names=job_names,
+            chunk_size=chunk_size,
+            sample_fraction=sample_fraction,
+            max_samples=max_samples,
+            random_state=random_state
+        )
+        
+        if len(features_df) < 10:
+            print(f"Not enough training data: {len(features_df)} records. Need at least 10.")
             return None
         
+        if start_time is None and end_time is None and not job_names:
+            self.watermark = last_id
+        
         X = features_df[self.feature_columns]
         y = features_df['success']
         
@@ -120,99 +269,250 @@ class ModelTrainer:
         
         return self.model
     
+    @staticmethod
+    def state_path(model_path: str) -> str:
+        return os.path.splitext(model_path)[0] + '.state.json'
+    
+    def load_state(self, model_path: str) -> Optional[Dict[str, any]]:
+        try:
+            with open(self.state_path(model_path)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def train_incremental(self, model_path: str = "models/model.pkl", trees_per_update: int = 10,
+                          max_trees: int = 200, min_samples: int = 10, random_state: int = 42,
+                          max_samples: Optional[int] = None):
+        state = self.load_state(model_path)
+        if state is None or not os.path.exists(model_path):
+            print("No previous incremental state found, running full training.")
+            return self.train(random_state=random_state)
+        
+        self.model = joblib.load(model_path)
+        self.watermark = state.get('watermark')
+        
+        features_df, last_id = self.load_training_features(
+            since_id=self.watermark, max_samples=max_samples, random_state=random_state
+        )
+        if len(features_df) < min_samples:
+            print(f"Only {len(features_df)} new records since the last training run. Need at least {min_samples}.")
+            return None
+        
+        y = features_df['success']
+        if set(y.unique()) != set(self.model.classes_):
+            print("New records do not cover every outcome class yet. Waiting for more data.")
+            return None
+        
+        weights = compute_class_weight('balanced', classes=self.model.classes_, y=y)
+        self.model.set_params(
+            warm_start=True,
+            n_estimators=len(self.model.estimators_) + trees_per_update,
+            random_state=random_state,
+            class_weight=dict(zip(self.model.classes_, weights))
+        )
+        self.model.fit(features_df[self.feature_columns], y)
+        
+        if len(self.model.estimators_) > max_trees:
+            self.model.estimators_ = self.model.estimators_[-max_trees:]
+            self.model.n_estimators = max_trees
+        
+        self.watermark = last_id
+        print(f"Added {trees_per_update} trees from {len(features_df)} new samples "
+              f"({len(self.model.estimators_)} trees total)")
+        
+        return self.model
+    
     def save_model(self, model_path: str = "models/model.pkl"):
         if self.model is None:
             raise ValueError("No model to save. Train a model first.")
         
-        os.makedirs(os.path.dirname(model_path), exist_ok=True)
-        joblib.dump(self.model, model_path)
+        os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+        temp_path = model_path + '.tmp'
+        joblib.dump(self.model, temp_path)
+        os.replace(temp_path, model_path)
         print(f"Model saved to {model_path}")
+        
+        self.export_compiled(os.path.splitext(model_path)[0] + '.npz')
+        
+        if self.watermark is not None:
+            state = {
+                'watermark': self.watermark,
+                'n_estimators': len(self.model.estimators_),
+                'trained_at': time.time()
+            }
+            temp_path = self.state_path(model_path) + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_path(model_path))
+        elif os.path.exists(self.state_path(model_path)):
+            os.remove(self.state_path(model_path))
+    
+    def job_training_candidates(self, min_samples: int = 50) -> List[str]:
+        conn = sqlite3.connect(self.db_path)
+        migrate(conn)
+        
+        rows = conn.execute('''
+            SELECT job_name
+            FROM job_executions
+            WHERE system_state IS NOT NULL
+            GROUP BY job_name
+            HAVING COUNT(*) >= ? AND SUM(success) > 0 AND SUM(success) < COUNT(*)
+            ORDER BY job_name
+        ''', (min_samples,)).fetchall()
+        conn.close()
+        
+        return [row[0] for row in rows]
     
-    def generate_synthetic_data(self, n_samples: int = 1000, output_db: Optional[str] = None):
+    def train_per_job(self, model_dir: str = "models/jobs", min_samples: int = 50, random_state: int = 42,
+                      max_samples: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[str]:
+        trained = []
+        
+        for job_name in self.job_training_candidates(min_samples):
+            print(f"\nTraining model for job {job_name}")
+            self.watermark = None
+            model = self.train(
+                random_state=random_state,
+                job_names=[job_name],
+                max_samples=max_samples,
+                chunk_size=chunk_size
+            )
+            if model is not None:
+                self.save_model(job_model_path(model_dir, job_name))
+                trained.append(job_name)
+        
+        return trained
+    
+    def export_compiled(self, compiled_path: str):
+        if self.model is None:
+            raise ValueError("No model to export. Train a model first.")
+        
+        os.makedirs(os.path.dirname(compiled_path) or '.', exist_ok=True)
+        temp_path = compiled_path + '.tmp'
+        CompiledForest.from_sklearn(self.model).save(temp_path)
+        os.replace(temp_path, compiled_path)
+        print(f"Compiled model saved to {compiled_path}")
+    
+    def generate_synthetic_data(self, n_samples: int = 1000, output_db: Optional[str] = None,
+                                job_mix: Optional[Dict[str, Dict[str, float]]] = None,
+                                seed: Optional[int] = None, interval_sec: float = 3600.0,
+                                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                window_days: float = DEFAULT_SYNTHETIC_WINDOW_DAYS):
         if output_db is None:
             output_db = self.db_path
         
+        job_mix = job_mix or DEFAULT_JOB_MIX
+        job_names = list(job_mix)
+        specs = [dict(DEFAULT_JOB_SPEC, **job_mix[name]) for name in job_names]
+        weights = np.array([spec['weight'] for spec in specs], dtype=np.float64)
+        runtime_means = np.array([spec['runtime_sec'] for spec in specs], dtype=np.float64)
+        runtime_sigmas = np.array([spec['runtime_sigma'] for spec in specs], dtype=np.float64)
+        base_success = np.array([spec['base_success'] for spec in specs], dtype=np.float64)
+        
+        rng = np.random.default_rng(seed)
+        
         conn = sqlite3.connect(output_db)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS job_executions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_name TEXT NOT NULL,
-                start_time REAL NOT NULL,
-                end_time REAL,
-                exit_code INTEGER,
-                stdout TEXT,
-                stderr TEXT,
-                execution_time_sec REAL,
-                system_state TEXT,
-                ai_decision_reason TEXT,
-                success BOOLEAN,
-                timestamp TEXT
-            )
-        ''')
+        migrate(conn)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        
+        outputs = [
+            (encode_output(f"{name} completed\n"), encode_output(f"{name} failed\n"))
+            for name in job_names
+        ]
+        with conn:
+            conn.executemany(JOB_OUTPUT_INSERT, [blob for pair in outputs for blob in pair])
+        stdout_hashes = np.array([pair[0][0] for pair in outputs], dtype=object)
+        stderr_hashes = np.array([pair[1][0] for pair in outputs], dtype=object)
         
-        import json
-        import time
-        from datetime import datetime, timedelta
+        stats = {}
+        for name in job_names:
+            row = conn.execute("SELECT * FROM job_stats WHERE job_name = ?", (name,)).fetchone()
+            stats[name] = JobStats.from_row(row) if row else JobStats(name)
         
-        base_time = time.time() - (n_samples * 3600)
+        interval_sec = min(interval_sec, window_days * 86400 / max(n_samples, 1))
+        base_time = time.time() - n_samples * interval_sec
+        utc_offset = time.localtime(base_time).tm_gmtoff
         
-        for i in range(n_samples):
-            cpu_load = np.random.uniform(0, 100)
-            ram_percent = np.random.uniform(20, 95)
-            battery = np.random.uniform(20, 100)
-            is_charging = np.random.choice([0, 1], p=[0.3, 0.7])
-            idle_time = np.random.exponential(300)
+        for offset in range(0, n_samples, chunk_size):
+            size = min(chunk_size, n_samples - offset)
             
-            success_prob = 0.9
-            if cpu_load > 80:
-                success_prob -= 0.3
-            if ram_percent > 90:
-                success_prob -= 0.2
-            if battery < 30 and not is_charging:
-                success_prob -= 0.4
+            cpu_load = rng.uniform(0, 100, size).round(1)
+            ram_percent = rng.uniform(20, 95, size).round(1)
+            battery = rng.uniform(20, 100, size).round(1)
+            is_charging = rng.random(size) < 0.7
+            idle_time = rng.exponential(300, size).astype(np.int64)
+            jobs = rng.choice(len(job_names), size, p=weights / weights.sum())
             
-            success_prob = max(0.1, min(0.99, success_prob))
-            success = np.random.choice([0, 1], p=[1-success_prob, success_prob])
+            success_prob = (
+                base_success[jobs]
+                - 0.3 * (cpu_load > 80)
+                - 0.2 * (ram_percent > 90)
+                - 0.4 * ((battery < 30) & ~is_charging)
+            )
+            success = rng.random(size) < np.clip(success_prob, 0.1, 0.99)
             
-            system_state = {
-                "timestamp": base_time + i * 3600,
-                "cpu": {
-                    "load_5m": cpu_load / 20,
-                    "cpu_percent": cpu_load
-                },
-                "memory": {
-                    "percent": ram_percent
-                },
-                "battery": {
-                    "percent": battery,
-                    "is_charging": bool(is_charging)
-                },
-                "idle_time_sec": int(idle_time)
-            }
+            sigmas = runtime_sigmas[jobs]
+            runtimes = rng.lognormal(np.log(runtime_means[jobs]) - sigmas ** 2 / 2, sigmas).round(3)
+            start_times = (base_time + (offset + np.arange(size)) * interval_sec).round(3)
+            end_times = start_times + runtimes
+            load_5m = (cpu_load / 20).round(2)
             
-            cursor.execute('''
-                INSERT INTO job_executions 
-                (job_name, start_time, end_time, exit_code, execution_time_sec, 
-                 system_state, success, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                "synthetic_job",
-                base_time + i * 3600,
-                base_time + i * 3600 + 30,
-                0 if success else 1,
-                30.0,
-                json.dumps(system_state),
-                success,
-                datetime.fromtimestamp(base_time + i * 3600).isoformat()
-            ))
-        
-        conn.commit()
+            states = [
+                STATE_TEMPLATE % values
+                for values in zip(
+                    start_times.tolist(), load_5m.tolist(), cpu_load.tolist(), ram_percent.tolist(),
+                    battery.tolist(), np.where(is_charging, 'true', 'false').tolist(), idle_time.tolist()
+                )
+            ]
+            timestamps = np.datetime_as_string(((start_times + utc_offset) * 1e6).astype('datetime64[us]'))
+            
+            rows = zip(
+                np.array(job_names, dtype=object)[jobs].tolist(),
+                start_times.tolist(),
+                end_times.tolist(),
+                np.where(success, 0, 1).tolist(),
+                np.where(success, stdout_hashes[jobs], None).tolist(),
+                np.where(success, None, stderr_hashes[jobs]).tolist(),
+                runtimes.tolist(),
+                states,
+                [None] * size,
+                success.tolist(),
+                timestamps.tolist(),
+                load_5m.tolist(),
+                cpu_load.tolist(),
+                ram_percent.tolist(),
+                battery.tolist(),
+                is_charging.astype(int).tolist(),
+                idle_time.tolist()
+            )
+            
+            with conn:
+                conn.executemany(JOB_EXECUTION_INSERT, rows)
+                for index, name in enumerate(job_names):
+                    selected = jobs == index
+                    if selected.any():
+                        stats[name].update_many(success[selected], runtimes[selected], end_times[selected])
+                conn.executemany(JOB_STATS_INSERT, [job_stats.to_row() for job_stats in stats.values()])
+        
         conn.close()
         print(f"Generated {n_samples} synthetic training samples in {output_db}")
 
 
+def parse_time(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        from datetime import datetime
+        return datetime.fromisoformat(value).timestamp()
+
+
+def parse_job_mix(value: str) -> Dict[str, Dict[str, float]]:
+    if os.path.exists(value):
+        with open(value) as f:
+            return json.load(f)
+    return json.loads(value)
+
+
 def main():
     import argparse
     
@@ -220,20 +520,78 @@ def main():
     parser.add_argument("--db", default="/var/lib/smartcron/logs.db", help="Path to logs database")
     parser.add_argument("--output", default="models/model.pkl", help="Path to save trained model")
     parser.add_argument("--generate", type=int, help="Generate N synthetic training samples")
+    parser.add_argument("--generate-only", action="store_true", help="Generate synthetic data without training")
+    parser.add_argument("--seed", type=int, help="Random seed for synthetic data")
+    parser.add_argument("--job-mix", type=parse_job_mix,
+                        help="JSON object (or file) mapping synthetic job names to weight, runtime_sec, "
+                             "runtime_sigma and base_success")
+    parser.add_argument("--interval", type=float, default=3600.0,
+                        help="Seconds between synthetic executions, reduced to fit --window-days (default: 3600)")
+    parser.add_argument("--window-days", type=float, default=DEFAULT_SYNTHETIC_WINDOW_DAYS,
+                        help=f"Synthetic executions start within this many days before now "
+                             f"(default: {DEFAULT_SYNTHETIC_WINDOW_DAYS})")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Add trees trained on records newer than the last run instead of retraining")
+    parser.add_argument("--trees-per-update", type=int, default=10,
+                        help="Trees added per incremental run (default: 10)")
+    parser.add_argument("--max-trees", type=int, default=200,
+                        help="Oldest trees are dropped beyond this size (default: 200)")
+    parser.add_argument("--since", type=parse_time,
+                        help="Only train on executions started at or after this time (epoch or ISO 8601)")
+    parser.add_argument("--until", type=parse_time,
+                        help="Only train on executions started before this time (epoch or ISO 8601)")
+    parser.add_argument("--job", action="append", dest="jobs", help="Only train on this job (repeatable)")
+    parser.add_argument("--sample-fraction", type=float, help="Keep this fraction of executions at random")
+    parser.add_argument("--max-samples", type=int,
+                        help="Reservoir-sample at most this many executions to bound memory")
+    parser.add_argument("--per-job", action="store_true",
+                        help="Also train a model per job under <output dir>/jobs/")
+    parser.add_argument("--min-job-samples", type=int, default=50,
+                        help="Executions a job needs before it gets its own model (default: 50)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows read from the database per chunk (default: {DEFAULT_CHUNK_SIZE})")
     
     args = parser.parse_args()
     
     trainer = ModelTrainer(db_path=args.db)
     
     if args.generate:
-        trainer.generate_synthetic_data(n_samples=args.generate)
+        trainer.generate_synthetic_data(
+            n_samples=args.generate,
+            job_mix=args.job_mix,
+            seed=args.seed,
+            interval_sec=args.interval,
+            chunk_size=args.chunk_size,
+            window_days=args.window_days
+        )
+        if args.generate_only:
+            return
     
-    model = trainer.train()
+    if args.incremental:
+        model = trainer.train_incremental(
+            args.output, args.trees_per_update, args.max_trees, max_samples=args.max_samples
+        )
+    else:
+        model = trainer.train(
+            start_time=args.since,
+            end_time=args.until,
+            job_names=args.jobs,
+            sample_fraction=args.sample_fraction,
+            max_samples=args.max_samples,
+            chunk_size=args.chunk_size
+        )
     
     if model is not None:
         trainer.save_model(args.output)
-    else:
+    elif not args.incremental:
         print("Training failed. Check if there is enough data in the database.")
+    
+    if args.per_job:
+        job_dir = os.path.join(os.path.dirname(args.output), "jobs")
+        trained = trainer.train_per_job(
+            job_dir, args.min_job_samples, max_samples=args.max_samples, chunk_size=args.chunk_size
+        )
+        print(f"Trained {len(trained)} per-job model(s) in {job_dir}")
 
 
 if __name__ == "__main__":
@@ -134,7 +134,7 @@ def cmd_system_status(args):
 
 def cmd_job_history(args):
     logger = SmartCronLogger(db_path=args.db)
-    history = logger.get_job_history(args.job_name, limit=args.limit)
+    history = logger.get_job_history(args.job_name, limit=args.limit, include_output=args.verbose)
     
     if not history:
         print(f"No execution history found for job '{args.job_name}'.")
@@ -159,11 +159,20 @@ def cmd_job_history(args):
     
     print()
     
-    success_rate = logger.get_job_success_rate(args.job_name, last_n=args.limit)
-    avg_time = logger.get_average_execution_time(args.job_name, last_n=args.limit)
+    stats = logger.get_job_stats(args.job_name)
+    if stats is None:
+        return
     
-    print(f"Success Rate (last {args.limit}): {success_rate:.1%}")
-    print(f"Average Execution Time: {avg_time:.2f}s")
+    print(f"Total Runs: {stats['total_runs']} ({stats['success_count']} succeeded, {stats['failure_count']} failed)")
+    print(f"Success Rate: {stats['success_rate']:.1%} overall, "
+          f"{stats['recent_success_rate']:.1%} over the last {len(stats['recent_outcomes'])} runs")
+    if stats['failure_streak']:
+        print(f"Current Failure Streak: {stats['failure_streak']}")
+    else:
+        print(f"Current Success Streak: {stats['success_streak']}")
+    if stats['avg_runtime'] is not None:
+        print(f"Execution Time: avg {stats['avg_runtime']:.2f}s, recent {stats['ewma_runtime']:.2f}s, "
+              f"p50 {stats['p50_runtime']:.2f}s, p95 {stats['p95_runtime']:.2f}s, max {stats['max_runtime']:.2f}s")
     print()
 
 
@@ -0,0 +1,217 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+    HAS_ZONEINFO = True
+except ImportError:
+    HAS_ZONEINFO = False
+
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *"
+}
+
+MONTH_NAMES = {
+    name: index + 1
+    for index, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+    )
+}
+
+DAY_NAMES = {
+    name: index
+    for index, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])
+}
+
+MAX_YEARS_AHEAD = 8
+
+
+def _next_bit(mask: int, start: int) -> Optional[int]:
+    shifted = mask >> start
+    if shifted == 0:
+        return None
+    return start + ((shifted & -shifted).bit_length() - 1)
+
+
+def _parse_value(token: str, names: dict) -> int:
+    lowered = token.lower()
+    if lowered in names:
+        return names[lowered]
+    return int(token)
+
+
+def _parse_field(field: str, low: int, high: int, names: Optional[dict] = None) -> Tuple[int, bool]:
+    names = names or {}
+    mask = 0
+    restricted = True
+    
+    for part in field.split(","):
+        if not part:
+            raise ValueError(f"Empty item in cron field '{field}'")
+        
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Invalid step in cron field '{field}'")
+        
+        if part in ("*", "?"):
+            start, end = low, high
+            if step == 1:
+                restricted = False
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = _parse_value(start_text, names), _parse_value(end_text, names)
+        else:
+            start = _parse_value(part, names)
+            end = high if step > 1 else start
+        
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field '{field}' out of range {low}-{high}")
+        
+        for value in range(start, end + 1, step):
+            mask |= 1 << value
+    
+    return mask, restricted and field not in ("*", "?")
+
+
+class CronExpression:
+    
+    def __init__(self, expression: str, timezone: Optional[str] = None):
+        self.expression = expression.strip()
+        self.timezone = timezone
+        self.tz = None
+        
+        if timezone:
+            if not HAS_ZONEINFO:
+                raise ValueError("Timezones in cron schedules require Python 3.9+ (zoneinfo)")
+            try:
+                self.tz = ZoneInfo(timezone)
+            except Exception as e:
+                raise ValueError(f"Unknown timezone '{timezone}': {e}")
+        
+        text = ALIASES.get(self.expression.lower(), self.expression)
+        if text.startswith("@"):
+            raise ValueError(f"Unsupported cron alias: {self.expression}")
+        
+        fields = text.split()
+        if len(fields) == 5:
+            fields = ["0"] + fields
+        elif len(fields) != 6:
+            raise ValueError(f"Cron expression must have 5 or 6 fields: '{self.expression}'")
+        
+        self.seconds, _ = _parse_field(fields[0], 0, 59)
+        self.minutes, _ = _parse_field(fields[1], 0, 59)
+        self.hours, _ = _parse_field(fields[2], 0, 23)
+        days_of_month, dom_restricted = _parse_field(fields[3], 1, 31)
+        self.months, _ = _parse_field(fields[4], 1, 12, MONTH_NAMES)
+        days_of_week, dow_restricted = _parse_field(fields[5], 0, 7, DAY_NAMES)
+        
+        if days_of_week & (1 << 7):
+            days_of_week = (days_of_week | 1) & ~(1 << 7)
+        
+        self.days_of_month = days_of_month
+        self.days_of_week = days_of_week
+        self.dom_restricted = dom_restricted
+        self.dow_restricted = dow_restricted
+    
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r}, timezone={self.timezone!r})"
+    
+    def _day_matches(self, day: datetime) -> bool:
+        dom_match = bool(self.days_of_month & (1 << day.day))
+        dow_match = bool(self.days_of_week & (1 << ((day.weekday() + 1) % 7)))
+        
+        if self.dom_restricted and self.dow_restricted:
+            return dom_match or dow_match
+        if self.dom_restricted:
+            return dom_match
+        if self.dow_restricted:
+            return dow_match
+        return True
+    
+    def _to_wall_clock(self, timestamp: float) -> datetime:
+        if self.tz is not None:
+            return datetime.fromtimestamp(timestamp, self.tz).replace(tzinfo=None)
+        return datetime.fromtimestamp(timestamp)
+    
+    def _to_timestamp(self, wall_clock: datetime) -> float:
+        if self.tz is not None:
+            return wall_clock.replace(tzinfo=self.tz).timestamp()
+        return wall_clock.timestamp()
+    
+    def _next_wall_clock(self, current: datetime) -> Optional[datetime]:
+        limit_year = current.year + MAX_YEARS_AHEAD
+        
+        while current.year <= limit_year:
+            month = _next_bit(self.months, current.month)
+            if month != current.month:
+                if month is None:
+                    current = datetime(current.year + 1, 1, 1)
+                else:
+                    current = datetime(current.year, month, 1)
+                continue
+            
+            if not self._day_matches(current):
+                current = datetime(current.year, current.month, current.day) + timedelta(days=1)
+                continue
+            
+            hour = _next_bit(self.hours, current.hour)
+            if hour != current.hour:
+                if hour is None:
+                    current = datetime(current.year, current.month, current.day) + timedelta(days=1)
+                else:
+                    current = current.replace(hour=hour, minute=0, second=0)
+                continue
+            
+            minute = _next_bit(self.minutes, current.minute)
+            if minute != current.minute:
+                if minute is None:
+                    current = current.replace(minute=0, second=0) + timedelta(hours=1)
+                else:
+                    current = current.replace(minute=minute, second=0)
+                continue
+            
+            second = _next_bit(self.seconds, current.second)
+            if second != current.second:
+                if second is None:
+                    current = current.replace(second=0) + timedelta(minutes=1)
+                else:
+                    current = current.replace(second=second)
+                continue
+            
+            return current
+        
+        return None
+    
+    def next_fire_after(self, timestamp: float) -> Optional[float]:
+        current = self._to_wall_clock(timestamp).replace(microsecond=0) + timedelta(seconds=1)
+        
+        while True:
+            wall_clock = self._next_wall_clock(current)
+            if wall_clock is None:
+                return None
+            
+            fire_time = self._to_timestamp(wall_clock)
+            if fire_time > timestamp:
+                return fire_time
+            
+            current = wall_clock + timedelta(seconds=1)
+    
+    def next_fire_times(self, timestamp: float, count: int) -> List[float]:
+        times = []
+        for _ in range(count):
+            next_time = self.next_fire_after(timestamp)
+            if next_time is None:
+                break
+            times.append(next_time)
+            timestamp = next_time
+        return times
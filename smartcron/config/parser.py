@@ -1,9 +1,13 @@
 import yaml
 import json
 import os
-from typing import Dict, List, Optional
+import random
+import time
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
-from datetime import datetime, time as dt_time
+from datetime import datetime, timedelta, time as dt_time
+
+from smartcron.config.cron import CronExpression
 
 try:
     import jsonschema
@@ -30,15 +34,69 @@ JOB_SCHEMA = {
         "ai_aware": {"type": "boolean"},
         "retry_on_fail": {"type": "boolean"},
         "max_retries": {"type": "integer"},
+        "retry_delay_sec": {"type": "number", "minimum": 0},
+        "retry_backoff": {"type": "number", "minimum": 1},
+        "retry_max_delay_sec": {"type": "number", "minimum": 0},
+        "retry_jitter": {"type": "number", "minimum": 0, "maximum": 1},
         "timeout_sec": {"type": "number"},
         "enabled": {"type": "boolean"},
         "schedule_window_start": {"type": "string"},
-        "schedule_window_end": {"type": "string"}
+        "schedule_window_end": {"type": "string"},
+        "schedule": {"type": "string"},
+        "timezone": {"type": "string"},
+        "job_group": {"type": "string"}
     },
     "required": ["job_name", "command"]
 }
 
 
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_minute_of_day(value: str) -> Optional[int]:
+    try:
+        parsed = datetime.strptime(value, "%H:%M")
+    except (TypeError, ValueError):
+        return None
+    return parsed.hour * 60 + parsed.minute
+
+
+def minute_to_time(minute: int) -> dt_time:
+    return dt_time(minute // 60, minute % 60)
+
+
+def merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect_intervals(a: List[Tuple[int, int]], b: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def minute_in_intervals(intervals: Optional[List[Tuple[int, int]]], at: datetime) -> bool:
+    if intervals is None:
+        return True
+    minute = at.hour * 60 + at.minute
+    return any(start <= minute < end for start, end in intervals)
+
+
 class JobConfig:
     
     def __init__(self, config_dict: Dict):
@@ -56,14 +114,25 @@ class JobConfig:
         self.ai_aware = config_dict.get("ai_aware", False)
         self.retry_on_fail = config_dict.get("retry_on_fail", False)
         self.max_retries = config_dict.get("max_retries", 3)
+        self.retry_delay_sec = config_dict.get("retry_delay_sec", 60)
+        self.retry_backoff = config_dict.get("retry_backoff", 2.0)
+        self.retry_max_delay_sec = config_dict.get("retry_max_delay_sec", 3600)
+        self.retry_jitter = config_dict.get("retry_jitter", 0.1)
         self.timeout_sec = config_dict.get("timeout_sec")
         self.enabled = config_dict.get("enabled", True)
         self.schedule_window_start = config_dict.get("schedule_window_start")
         self.schedule_window_end = config_dict.get("schedule_window_end")
+        self.schedule = config_dict.get("schedule")
+        self.timezone = config_dict.get("timezone")
+        self.job_group = config_dict.get("job_group")
+        
+        self.compile_time_rules()
         
         self.retry_count = 0
+        self.next_retry_time = None
         self.last_run_time = None
         self.last_run_success = None
+        self.next_fire_time = self._cron.next_fire_after(time.time()) if self._cron else None
     
     def get_constraints(self) -> Dict:
         constraints = {}
@@ -79,42 +148,106 @@ class JobConfig:
             constraints["min_idle_time_sec"] = self.min_idle_time_sec
         return constraints
     
-    def is_in_schedule_window(self) -> bool:
-        if not self.schedule_window_start or not self.schedule_window_end:
-            return True
+    def get_retry_delay(self, attempt: int) -> float:
+        delay = self.retry_delay_sec * (self.retry_backoff ** max(0, attempt - 1))
+        delay = min(delay, self.retry_max_delay_sec)
         
-        now = datetime.now().time()
+        if self.retry_jitter:
+            delay += delay * random.uniform(-self.retry_jitter, self.retry_jitter)
         
-        try:
-            start = datetime.strptime(self.schedule_window_start, "%H:%M").time()
-            end = datetime.strptime(self.schedule_window_end, "%H:%M").time()
-        except ValueError:
-            return True
+        return max(0.0, delay)
+    
+    def copy_runtime_state(self, other: "JobConfig"):
+        self.retry_count = other.retry_count
+        self.next_retry_time = other.next_retry_time
+        self.last_run_time = other.last_run_time
+        self.last_run_success = other.last_run_success
+        if self._cron and (self.schedule, self.timezone) == (other.schedule, other.timezone):
+            self.next_fire_time = other.next_fire_time
+    
+    def compile_time_rules(self):
+        self._cron = CronExpression(self.schedule, self.timezone) if self.schedule else None
         
-        if start <= end:
-            return start <= now <= end
-        else:
-            return now >= start or now <= end
+        self._window_intervals = None
+        if self.schedule_window_start and self.schedule_window_end:
+            start = parse_minute_of_day(self.schedule_window_start)
+            end = parse_minute_of_day(self.schedule_window_end)
+            if start is not None and end is not None:
+                if start <= end:
+                    self._window_intervals = [(start, end + 1)]
+                else:
+                    self._window_intervals = merge_intervals([(0, end + 1), (start, MINUTES_PER_DAY)])
+        
+        self._preferred_intervals = None
+        if self.preferred_time:
+            intervals = []
+            for pref_time in self.preferred_time:
+                try:
+                    pref_hour = int(pref_time.split(":")[0])
+                except (ValueError, IndexError):
+                    continue
+                start = max(0, pref_hour - 1) * 60
+                end = min(24, pref_hour + 2) * 60
+                if start < end:
+                    intervals.append((start, end))
+            self._preferred_intervals = merge_intervals(intervals)
+    
+    def _eligible_intervals(self) -> Optional[List[Tuple[int, int]]]:
+        intervals = self._window_intervals
+        if not self.ai_aware and self._preferred_intervals is not None:
+            if intervals is None:
+                intervals = self._preferred_intervals
+            else:
+                intervals = intersect_intervals(intervals, self._preferred_intervals)
+        return intervals
+    
+    def is_in_schedule_window(self, at: Optional[datetime] = None) -> bool:
+        return minute_in_intervals(self._window_intervals, at or datetime.now())
+    
+    def should_run_at_preferred_time(self, at: Optional[datetime] = None) -> bool:
+        return minute_in_intervals(self._preferred_intervals, at or datetime.now())
     
-    def should_run_at_preferred_time(self) -> bool:
-        if not self.preferred_time:
+    def is_due(self, now: float) -> bool:
+        if self._cron is None:
             return True
+        return self.next_fire_time is not None and self.next_fire_time <= now
+    
+    def advance_schedule(self, now: float):
+        if self._cron is not None:
+            self.next_fire_time = self._cron.next_fire_after(now)
+    
+    def is_eligible_at(self, at: datetime) -> bool:
+        return self.is_due(at.timestamp()) and minute_in_intervals(self._eligible_intervals(), at)
+    
+    def next_eligible_time(self, now: float) -> Optional[float]:
+        if not self.enabled:
+            return None
+        
+        if self._cron is not None:
+            if self.next_fire_time is None:
+                return None
+            now = max(now, self.next_fire_time)
+        
+        intervals = self._eligible_intervals()
+        if intervals is None:
+            return now
+        if not intervals:
+            return None
         
-        now = datetime.now().strftime("%H:%M")
-        current_hour = datetime.now().hour
+        current = datetime.fromtimestamp(now)
+        minute = current.hour * 60 + current.minute
         
-        for pref_time in self.preferred_time:
-            try:
-                pref_hour = int(pref_time.split(":")[0])
-                if abs(current_hour - pref_hour) <= 1:
-                    return True
-            except (ValueError, IndexError):
-                continue
+        for start, end in intervals:
+            if start <= minute < end:
+                return now
+            if start > minute:
+                return datetime.combine(current.date(), minute_to_time(start)).timestamp()
         
-        return False
+        tomorrow = current.date() + timedelta(days=1)
+        return datetime.combine(tomorrow, minute_to_time(intervals[0][0])).timestamp()
     
     def to_dict(self) -> Dict:
-        return {
+        config = {
             "job_name": self.job_name,
             "command": self.command,
             "preferred_time": self.preferred_time,
@@ -124,9 +257,12 @@ class JobConfig:
             "ai_aware": self.ai_aware,
             "retry_on_fail": self.retry_on_fail,
             "enabled": self.enabled,
+            "schedule": self.schedule,
+            "timezone": self.timezone,
             "last_run_time": self.last_run_time,
             "last_run_success": self.last_run_success
         }
+        return {key: value for key, value in config.items() if value is not None}
 
 
 class JobConfigParser:
@@ -146,6 +282,19 @@ class JobConfigParser:
         
         return JobConfig(config_dict)
     
+    def config_signature(self) -> tuple:
+        if not os.path.exists(self.config_dir):
+            return ()
+        
+        signature = []
+        for entry in os.scandir(self.config_dir):
+            if entry.name.endswith(('.yaml', '.yml', '.json')):
+                try:
+                    signature.append((entry.name, entry.stat().st_mtime_ns))
+                except OSError:
+                    continue
+        return tuple(sorted(signature))
+    
     def load_all_jobs(self) -> List[JobConfig]:
         jobs = []
         
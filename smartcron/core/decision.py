@@ -1,17 +1,28 @@
 from typing import Dict, Optional, List
 from datetime import datetime
+import heapq
+import itertools
 import time
 
 
+DEFAULT_EXECUTION_TIME_SEC = 60
+
+
 class DecisionEngine:
     
-    def __init__(self, ai_predictor=None, system_monitor=None):
+    def __init__(self, ai_predictor=None, system_monitor=None, history=None, history_ttl: float = 300.0):
         self.ai_predictor = ai_predictor
         self.system_monitor = system_monitor
+        self.history = history
+        self.history_ttl = history_ttl
+        self._history_cache = {}
         self.pending_jobs = []
         self.deferred_jobs = {}
+        self._deferred_heap = []
+        self._deferred_seq = itertools.count()
     
-    def should_run_job(self, job_config, force: bool = False) -> Dict[str, any]:
+    def _check_preconditions(self, job_config, force: bool,
+                             system_metrics: Dict) -> Optional[Dict[str, any]]:
         decision = {
             "should_run": False,
             "reason": "",
@@ -34,56 +45,54 @@ class DecisionEngine:
             decision["defer_until"] = time.time() + 3600
             return decision
         
-        system_metrics = self.system_monitor.get_all_metrics() if self.system_monitor else {}
-        
         constraints_met = True
         constraint_failures = []
         
         if self.system_monitor:
             constraints = job_config.get_constraints()
             if constraints:
-                constraints_met = self.system_monitor.check_constraints(constraints)
-                
-                if not constraints_met:
-                    metrics = system_metrics
-                    if "max_cpu" in constraints and metrics["cpu"]["cpu_percent"] > constraints["max_cpu"]:
-                        constraint_failures.append(f"CPU {metrics['cpu']['cpu_percent']:.1f}% > {constraints['max_cpu']}%")
-                    
-                    if "max_memory_percent" in constraints and metrics["memory"]["percent"] > constraints["max_memory_percent"]:
-                        constraint_failures.append(f"RAM {metrics['memory']['percent']:.1f}% > {constraints['max_memory_percent']}%")
-                    
-                    if "min_battery" in constraints:
-                        battery = metrics.get("battery")
-                        if battery and not battery["is_charging"] and battery["percent"] < constraints["min_battery"]:
-                            constraint_failures.append(f"Battery {battery['percent']:.1f}% < {constraints['min_battery']}%")
+                constraint_failures = self.system_monitor.get_constraint_failures(constraints, system_metrics)
+                constraints_met = not constraint_failures
         
         if not constraints_met:
             decision["reason"] = f"Constraints not met: {', '.join(constraint_failures)}"
             decision["defer_until"] = time.time() + 300
             return decision
         
-        if job_config.ai_aware and self.ai_predictor:
-            job_info = {
-                "last_job_success": job_config.last_run_success if job_config.last_run_success is not None else True,
-                "avg_execution_time": 60
-            }
-            
-            ai_decision = self.ai_predictor.get_decision_score(system_metrics, job_info)
-            
-            decision["score"] = ai_decision["probability_of_success"]
-            decision["reason"] = ai_decision["reason"]
-            
-            if ai_decision["decision"] == "run_now":
-                decision["should_run"] = True
-            elif ai_decision["decision"] == "defer":
-                decision["defer_until"] = time.time() + 600
-            else:
-                decision["defer_until"] = time.time() + 1800
-        else:
+        return None
+    
+    def _uses_ai(self, job_config) -> bool:
+        return bool(job_config.ai_aware and self.ai_predictor)
+    
+    @staticmethod
+    def _ai_decision(ai_decision: Dict[str, any]) -> Dict[str, any]:
+        decision = {
+            "should_run": False,
+            "reason": ai_decision["reason"],
+            "score": ai_decision["probability_of_success"],
+            "defer_until": None
+        }
+        
+        if ai_decision["decision"] == "run_now":
             decision["should_run"] = True
-            decision["score"] = 1.0
-            decision["reason"] = "Static scheduling: constraints met"
+        elif ai_decision["decision"] == "defer":
+            decision["defer_until"] = time.time() + 600
+        else:
+            decision["defer_until"] = time.time() + 1800
         
+        return decision
+    
+    @staticmethod
+    def _static_decision() -> Dict[str, any]:
+        return {
+            "should_run": True,
+            "reason": "Static scheduling: constraints met",
+            "score": 1.0,
+            "defer_until": None
+        }
+    
+    @staticmethod
+    def _apply_preferred_time(job_config, decision: Dict[str, any]) -> Dict[str, any]:
         if decision["should_run"] and not job_config.should_run_at_preferred_time():
             if job_config.ai_aware:
                 pass
@@ -94,11 +103,94 @@ class DecisionEngine:
         
         return decision
     
-    def prioritize_jobs(self, jobs: List) -> List:
-        scored_jobs = []
+    def should_run_job(self, job_config, force: bool = False,
+                       system_metrics: Optional[Dict] = None) -> Dict[str, any]:
+        if system_metrics is None and job_config.enabled and not force:
+            system_metrics = self.system_monitor.snapshot() if self.system_monitor else {}
+        
+        decision = self._check_preconditions(job_config, force, system_metrics)
+        if decision is not None:
+            return decision
+        
+        if self._uses_ai(job_config):
+            job_info = self.get_job_info(job_config)
+            decision = self._ai_decision(self.ai_predictor.get_decision_score(system_metrics, job_info))
+        else:
+            decision = self._static_decision()
+        
+        return self._apply_preferred_time(job_config, decision)
+    
+    def _job_history(self, job_name: str, now: float) -> Dict[str, any]:
+        cached = self._history_cache.get(job_name)
+        if cached is not None and now - cached[0] < self.history_ttl:
+            return cached[1]
+        
+        stats = None
+        if self.history is not None:
+            try:
+                stats = self.history.get_job_stats(job_name)
+            except Exception:
+                stats = None
+        
+        history = {
+            "avg_execution_time": DEFAULT_EXECUTION_TIME_SEC,
+            "p95_execution_time": None,
+            "recent_failure_rate": None,
+            "last_success_time": None
+        }
+        if stats:
+            runtime = stats["ewma_runtime"] if stats["ewma_runtime"] is not None else stats["avg_runtime"]
+            if runtime is not None:
+                history["avg_execution_time"] = runtime
+            history["p95_execution_time"] = stats["p95_runtime"]
+            if stats["recent_success_rate"] is not None:
+                history["recent_failure_rate"] = 1.0 - stats["recent_success_rate"]
+            history["last_success_time"] = stats["last_success_time"]
+        
+        self._history_cache[job_name] = (now, history)
+        return history
+    
+    def invalidate_job_history(self, job_name: str):
+        self._history_cache.pop(job_name, None)
+    
+    def get_job_info(self, job_config, now: Optional[float] = None) -> Dict[str, any]:
+        now = time.time() if now is None else now
+        history = self._job_history(job_config.job_name, now)
+        last_success_time = history["last_success_time"]
+        
+        return {
+            "job_name": job_config.job_name,
+            "last_job_success": job_config.last_run_success if job_config.last_run_success is not None else True,
+            "avg_execution_time": history["avg_execution_time"],
+            "p95_execution_time": history["p95_execution_time"],
+            "recent_failure_rate": history["recent_failure_rate"],
+            "time_since_last_success": now - last_success_time if last_success_time is not None else None
+        }
+    
+    def prioritize_jobs(self, jobs: List, system_metrics: Optional[Dict] = None) -> List:
+        if system_metrics is None:
+            system_metrics = self.system_monitor.snapshot() if self.system_monitor and jobs else {}
+        
+        decisions = [None] * len(jobs)
+        ai_indices = []
+        
+        for index, job in enumerate(jobs):
+            decision = self._check_preconditions(job, False, system_metrics)
+            if decision is None:
+                if self._uses_ai(job):
+                    ai_indices.append(index)
+                    continue
+                decision = self._apply_preferred_time(job, self._static_decision())
+            decisions[index] = decision
+        
+        if ai_indices:
+            job_infos = [self.get_job_info(jobs[index]) for index in ai_indices]
+            ai_decisions = self.ai_predictor.get_decision_scores(system_metrics, job_infos)
+            for index, ai_decision in zip(ai_indices, ai_decisions):
+                decisions[index] = self._apply_preferred_time(jobs[index], self._ai_decision(ai_decision))
         
-        for job in jobs:
-            decision = self.should_run_job(job)
+        scored_jobs = []
+        for job, decision in zip(jobs, decisions):
             if decision["should_run"] or decision["defer_until"]:
                 scored_jobs.append({
                     "job": job,
@@ -111,27 +203,44 @@ class DecisionEngine:
         return scored_jobs
     
     def add_deferred_job(self, job_config, defer_until: float):
+        seq = next(self._deferred_seq)
         self.deferred_jobs[job_config.job_name] = {
             "job": job_config,
-            "defer_until": defer_until
+            "defer_until": defer_until,
+            "seq": seq
         }
+        heapq.heappush(self._deferred_heap, (defer_until, seq, job_config.job_name))
+        
+        if len(self._deferred_heap) > 2 * len(self.deferred_jobs) + 64:
+            self._compact_deferred_heap()
+    
+    def _compact_deferred_heap(self):
+        self._deferred_heap = [
+            (deferred["defer_until"], deferred["seq"], job_name)
+            for job_name, deferred in self.deferred_jobs.items()
+        ]
+        heapq.heapify(self._deferred_heap)
     
-    def get_ready_deferred_jobs(self) -> List:
+    def _is_live_entry(self, entry) -> bool:
+        deferred = self.deferred_jobs.get(entry[2])
+        return deferred is not None and deferred["seq"] == entry[1]
+    
+    def get_ready_deferred_jobs(self, now: Optional[float] = None) -> List:
         ready_jobs = []
-        current_time = time.time()
-        
-        jobs_to_remove = []
-        for job_name, deferred in self.deferred_jobs.items():
-            if current_time >= deferred["defer_until"]:
-                ready_jobs.append(deferred["job"])
-                jobs_to_remove.append(job_name)
+        current_time = time.time() if now is None else now
         
-        for job_name in jobs_to_remove:
-            del self.deferred_jobs[job_name]
+        while self._deferred_heap and self._deferred_heap[0][0] <= current_time:
+            entry = heapq.heappop(self._deferred_heap)
+            if self._is_live_entry(entry):
+                ready_jobs.append(self.deferred_jobs.pop(entry[2])["job"])
         
         return ready_jobs
     
+    def next_deferred_time(self) -> Optional[float]:
+        while self._deferred_heap and not self._is_live_entry(self._deferred_heap[0]):
+            heapq.heappop(self._deferred_heap)
+        
+        return self._deferred_heap[0][0] if self._deferred_heap else None
+    
     def clear_deferred_job(self, job_name: str):
-        if job_name in self.deferred_jobs:
-            del self.deferred_jobs[job_name]
-
+        self.deferred_jobs.pop(job_name, None)
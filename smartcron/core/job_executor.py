@@ -1,16 +1,211 @@
+import asyncio
 import subprocess
 import time
 import signal
 import os
-from typing import Dict, Optional, Tuple
-from threading import Timer
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from threading import Lock, Thread, Timer
+
+from smartcron.core.output import (
+    DEFAULT_HEAD_BYTES, DEFAULT_TAIL_BYTES, OutputCapture, prune_run_logs, run_log_path
+)
+
+
+READER_JOIN_TIMEOUT = 5.0
 
 
 class JobExecutor:
     
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, max_parallel_jobs: Optional[int] = None,
+                 group_limits: Optional[Dict[str, int]] = None,
+                 on_complete: Optional[Callable[[], None]] = None,
+                 output_dir: Optional[str] = None, keep_run_logs: int = 20,
+                 output_head_bytes: int = DEFAULT_HEAD_BYTES,
+                 output_tail_bytes: int = DEFAULT_TAIL_BYTES):
         self.logger = logger
+        self.on_complete = on_complete
+        self.output_dir = output_dir
+        self.keep_run_logs = keep_run_logs
+        self.output_head_bytes = output_head_bytes
+        self.output_tail_bytes = output_tail_bytes
         self.running_jobs = {}
+        self.max_parallel_jobs = max_parallel_jobs
+        self.group_limits = group_limits or {}
+        self._pool = None
+        self._lock = Lock()
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_parallel_jobs or 1,
+                thread_name_prefix="smartcron-job"
+            )
+        return self._pool
+    
+    def is_running(self, job_name: str) -> bool:
+        return job_name in self.running_jobs
+    
+    def running_count(self, job_group: Optional[str] = None) -> int:
+        with self._lock:
+            if job_group is None:
+                return len(self.running_jobs)
+            return sum(1 for entry in self.running_jobs.values() if entry["group"] == job_group)
+    
+    def can_start(self, job_config) -> bool:
+        if self.is_running(job_config.job_name):
+            return False
+        
+        if self.max_parallel_jobs and self.running_count() >= self.max_parallel_jobs:
+            return False
+        
+        group = job_config.job_group
+        if group is not None and group in self.group_limits:
+            if self.running_count(group) >= self.group_limits[group]:
+                return False
+        
+        return True
+    
+    def submit(self, job_config, system_metrics: Dict) -> bool:
+        if not self.can_start(job_config):
+            return False
+        
+        future = self._get_pool().submit(self.execute_with_retry, job_config, system_metrics)
+        
+        with self._lock:
+            self.running_jobs[job_config.job_name] = {
+                "job": job_config,
+                "group": job_config.job_group,
+                "start_time": time.time(),
+                "future": future
+            }
+        
+        if self.on_complete is not None:
+            future.add_done_callback(lambda _: self.on_complete())
+        
+        return True
+    
+    def submit_async(self, job_config, system_metrics: Dict) -> Optional[asyncio.Task]:
+        if not self.can_start(job_config):
+            return None
+        
+        task = asyncio.ensure_future(self.execute_with_retry_async(job_config, system_metrics))
+        
+        with self._lock:
+            self.running_jobs[job_config.job_name] = {
+                "job": job_config,
+                "group": job_config.job_group,
+                "start_time": time.time(),
+                "future": task
+            }
+        
+        return task
+    
+    def collect_completed(self) -> List[Tuple[object, Dict[str, any]]]:
+        completed = []
+        
+        with self._lock:
+            finished = [name for name, entry in self.running_jobs.items() if entry["future"].done()]
+            entries = [self.running_jobs.pop(name) for name in finished]
+        
+        for entry in entries:
+            job_config = entry["job"]
+            try:
+                result = entry["future"].result()
+            except (Exception, asyncio.CancelledError) as e:
+                end_time = time.time()
+                result = {
+                    "job_name": job_config.job_name,
+                    "start_time": entry["start_time"],
+                    "end_time": end_time,
+                    "exit_code": -1,
+                    "stdout": "",
+                    "stderr": str(e),
+                    "execution_time": end_time - entry["start_time"],
+                    "success": False,
+                    "timed_out": False
+                }
+            completed.append((job_config, result))
+        
+        return completed
+    
+    def get_running_jobs(self) -> List[Dict[str, any]]:
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "name": name,
+                    "group": entry["group"],
+                    "start_time": entry["start_time"],
+                    "elapsed": now - entry["start_time"]
+                }
+                for name, entry in self.running_jobs.items()
+            ]
+    
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+    
+    def _open_capture(self, job_name: str, start_time: float) -> OutputCapture:
+        log_path = None
+        if self.output_dir:
+            log_path = run_log_path(self.output_dir, job_name, start_time)
+            prune_run_logs(os.path.dirname(log_path), max(0, self.keep_run_logs - 1))
+        return OutputCapture(log_path, self.output_head_bytes, self.output_tail_bytes)
+    
+    @staticmethod
+    def _build_result(job_name: str, start_time: float, end_time: float, exit_code: int,
+                      capture: Optional[OutputCapture], timed_out: bool = False,
+                      error: Optional[str] = None) -> Dict[str, any]:
+        execution_result = {
+            "job_name": job_name,
+            "start_time": start_time,
+            "end_time": end_time,
+            "exit_code": exit_code,
+            "stdout": "",
+            "stderr": "",
+            "execution_time": end_time - start_time,
+            "success": exit_code == 0 and not timed_out and error is None,
+            "timed_out": timed_out,
+            "stdout_bytes": 0,
+            "stderr_bytes": 0,
+            "output_truncated": False,
+            "output_path": None
+        }
+        
+        if capture is not None:
+            execution_result.update(capture.result_fields())
+        
+        if error is not None:
+            execution_result["stderr"] = error
+        elif timed_out and not execution_result["stderr"]:
+            execution_result["stderr"] = "Job timed out"
+        
+        return execution_result
+    
+    def _report_result(self, job_config, execution_result: Dict[str, any], system_metrics: Dict,
+                       error: Optional[str] = None):
+        job_name = job_config.job_name
+        
+        if self.logger:
+            if error is not None:
+                self.logger.error(f"Job {job_name} failed with exception: {error}")
+            elif execution_result["timed_out"]:
+                self.logger.error(f"Job {job_name} timed out after {job_config.timeout_sec}s")
+            else:
+                status = "SUCCESS" if execution_result["success"] else "FAILED"
+                self.logger.info(
+                    f"Job {job_name} completed: {status} "
+                    f"(exit_code={execution_result['exit_code']}, "
+                    f"duration={execution_result['execution_time']:.2f}s, "
+                    f"output={execution_result['stdout_bytes'] + execution_result['stderr_bytes']} bytes)"
+                )
+        
+        self._record_execution(
+            job_config, execution_result, system_metrics,
+            "Timed out" if execution_result["timed_out"] else None
+        )
     
     def execute_job(self, job_config, system_metrics: Dict) -> Dict[str, any]:
         job_name = job_config.job_name
@@ -22,133 +217,165 @@ class JobExecutor:
             self.logger.debug(f"Command: {command}")
         
         start_time = time.time()
+        capture = None
+        process = None
+        error = None
         
         try:
-            result = subprocess.run(
+            capture = self._open_capture(job_name, start_time)
+            process = subprocess.Popen(
                 command,
                 shell=True,
-                capture_output=True,
-                text=True,
-                timeout=timeout
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True
             )
             
-            end_time = time.time()
+            readers = [
+                Thread(target=capture.pump, args=(process.stdout, capture.stdout), daemon=True),
+                Thread(target=capture.pump, args=(process.stderr, capture.stderr), daemon=True)
+            ]
+            for reader in readers:
+                reader.start()
             
-            execution_result = {
-                "job_name": job_name,
-                "start_time": start_time,
-                "end_time": end_time,
-                "exit_code": result.returncode,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "execution_time": end_time - start_time,
-                "success": result.returncode == 0,
-                "timed_out": False
-            }
+            timed_out = False
+            try:
+                exit_code = process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self._kill_process_group(process)
+                process.wait()
+                exit_code = -1
+                timed_out = True
             
-            if self.logger:
-                status = "SUCCESS" if execution_result["success"] else "FAILED"
-                self.logger.info(
-                    f"Job {job_name} completed: {status} "
-                    f"(exit_code={result.returncode}, duration={execution_result['execution_time']:.2f}s)"
-                )
-                
-                self.logger.log_job_execution(
-                    job_name=job_name,
-                    start_time=start_time,
-                    end_time=end_time,
-                    exit_code=result.returncode,
-                    stdout=result.stdout,
-                    stderr=result.stderr,
-                    system_state=system_metrics,
-                    ai_decision_reason=None
-                )
+            for reader, stream in zip(readers, (process.stdout, process.stderr)):
+                reader.join(READER_JOIN_TIMEOUT)
+                if not reader.is_alive():
+                    stream.close()
             
-            job_config.last_run_time = end_time
-            job_config.last_run_success = execution_result["success"]
+            end_time = time.time()
+            capture.close()
+            execution_result = self._build_result(job_name, start_time, end_time, exit_code, capture, timed_out)
             
-            return execution_result
+        except Exception as e:
+            if process is not None and process.poll() is None:
+                self._kill_process_group(process)
             
-        except subprocess.TimeoutExpired as e:
             end_time = time.time()
+            error = str(e)
+            execution_result = self._build_result(job_name, start_time, end_time, -1, capture, error=error)
             
-            execution_result = {
-                "job_name": job_name,
-                "start_time": start_time,
-                "end_time": end_time,
-                "exit_code": -1,
-                "stdout": e.stdout.decode() if e.stdout else "",
-                "stderr": e.stderr.decode() if e.stderr else "Job timed out",
-                "execution_time": end_time - start_time,
-                "success": False,
-                "timed_out": True
-            }
+        finally:
+            if capture is not None:
+                capture.close()
+        
+        self._report_result(job_config, execution_result, system_metrics, error)
+        return execution_result
+    
+    def next_retry_time(self, job_config, result: Dict[str, any]) -> Optional[float]:
+        if result["success"] or not job_config.retry_on_fail:
+            return None
+        
+        if job_config.retry_count >= job_config.max_retries:
+            return None
+        
+        return result["end_time"] + job_config.get_retry_delay(job_config.retry_count + 1)
+    
+    def execute_with_retry(self, job_config, system_metrics: Dict) -> Dict[str, any]:
+        result = self.execute_job(job_config, system_metrics)
+        result["retry_at"] = self.next_retry_time(job_config, result)
+        return result
+    
+    def _record_execution(self, job_config, execution_result: Dict[str, any], system_metrics: Dict,
+                          ai_decision_reason: Optional[str] = None):
+        if self.logger:
+            self.logger.log_job_execution(
+                job_name=execution_result["job_name"],
+                start_time=execution_result["start_time"],
+                end_time=execution_result["end_time"],
+                exit_code=execution_result["exit_code"],
+                stdout=execution_result["stdout"],
+                stderr=execution_result["stderr"],
+                system_state=system_metrics,
+                ai_decision_reason=ai_decision_reason
+            )
+        
+        job_config.last_run_time = execution_result["end_time"]
+        job_config.last_run_success = execution_result["success"]
+    
+    @staticmethod
+    def _kill_process_group(process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        except PermissionError:
+            process.kill()
+    
+    async def execute_job_async(self, job_config, system_metrics: Dict) -> Dict[str, any]:
+        job_name = job_config.job_name
+        command = job_config.command
+        timeout = job_config.timeout_sec
+        
+        if self.logger:
+            self.logger.info(f"Starting job: {job_name}")
+            self.logger.debug(f"Command: {command}")
+        
+        start_time = time.time()
+        capture = None
+        process = None
+        error = None
+        
+        try:
+            capture = self._open_capture(job_name, start_time)
+            process = await asyncio.create_subprocess_shell(
+                command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
             
-            if self.logger:
-                self.logger.error(f"Job {job_name} timed out after {timeout}s")
-                self.logger.log_job_execution(
-                    job_name=job_name,
-                    start_time=start_time,
-                    end_time=end_time,
-                    exit_code=-1,
-                    stdout=execution_result["stdout"],
-                    stderr=execution_result["stderr"],
-                    system_state=system_metrics,
-                    ai_decision_reason="Timed out"
+            timed_out = False
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        capture.pump_async(process.stdout, capture.stdout),
+                        capture.pump_async(process.stderr, capture.stderr),
+                        process.wait()
+                    ),
+                    timeout=timeout
                 )
+                exit_code = process.returncode
+            except asyncio.TimeoutError:
+                if process.returncode is None:
+                    self._kill_process_group(process)
+                    await process.wait()
+                exit_code = -1
+                timed_out = True
             
-            job_config.last_run_time = end_time
-            job_config.last_run_success = False
+            end_time = time.time()
+            capture.close()
+            execution_result = self._build_result(job_name, start_time, end_time, exit_code, capture, timed_out)
             
-            return execution_result
+        except asyncio.CancelledError:
+            if process is not None and process.returncode is None:
+                self._kill_process_group(process)
+            raise
             
         except Exception as e:
             end_time = time.time()
+            error = str(e)
+            execution_result = self._build_result(job_name, start_time, end_time, -1, capture, error=error)
             
-            execution_result = {
-                "job_name": job_name,
-                "start_time": start_time,
-                "end_time": end_time,
-                "exit_code": -1,
-                "stdout": "",
-                "stderr": str(e),
-                "execution_time": end_time - start_time,
-                "success": False,
-                "timed_out": False
-            }
-            
-            if self.logger:
-                self.logger.error(f"Job {job_name} failed with exception: {e}")
-                self.logger.log_job_execution(
-                    job_name=job_name,
-                    start_time=start_time,
-                    end_time=end_time,
-                    exit_code=-1,
-                    stdout="",
-                    stderr=str(e),
-                    system_state=system_metrics,
-                    ai_decision_reason=None
-                )
-            
-            job_config.last_run_time = end_time
-            job_config.last_run_success = False
-            
-            return execution_result
-    
-    def execute_with_retry(self, job_config, system_metrics: Dict) -> Dict[str, any]:
-        max_retries = job_config.max_retries if job_config.retry_on_fail else 0
-        
-        for attempt in range(max_retries + 1):
-            if attempt > 0:
-                if self.logger:
-                    self.logger.info(f"Retrying job {job_config.job_name} (attempt {attempt + 1}/{max_retries + 1})")
-                time.sleep(60)
-            
-            result = self.execute_job(job_config, system_metrics)
-            
-            if result["success"]:
-                return result
+        finally:
+            if capture is not None:
+                capture.close()
         
+        self._report_result(job_config, execution_result, system_metrics, error)
+        return execution_result
+    
+    async def execute_with_retry_async(self, job_config, system_metrics: Dict) -> Dict[str, any]:
+        result = await self.execute_job_async(job_config, system_metrics)
+        result["retry_at"] = self.next_retry_time(job_config, result)
         return result
     
     def execute_sandboxed(self, job_config, system_metrics: Dict, use_systemd: bool = False) -> Dict[str, any]:
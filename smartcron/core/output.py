@@ -0,0 +1,120 @@
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from smartcron.utils.paths import safe_filename
+
+
+DEFAULT_HEAD_BYTES = 64 * 1024
+DEFAULT_TAIL_BYTES = 64 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class BoundedBuffer:
+    
+    def __init__(self, head_bytes: int = DEFAULT_HEAD_BYTES, tail_bytes: int = DEFAULT_TAIL_BYTES):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.total_bytes = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+    
+    def feed(self, chunk: bytes):
+        self.total_bytes += len(chunk)
+        
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head += chunk[:room]
+            chunk = chunk[room:]
+        
+        if chunk and self.tail_bytes > 0:
+            self._tail += chunk
+            excess = len(self._tail) - self.tail_bytes
+            if excess > 0:
+                del self._tail[:excess]
+    
+    @property
+    def truncated(self) -> bool:
+        return self.total_bytes > len(self._head) + len(self._tail)
+    
+    def getvalue(self) -> bytes:
+        if not self.truncated:
+            return bytes(self._head + self._tail)
+        
+        omitted = self.total_bytes - len(self._head) - len(self._tail)
+        marker = f"\n... [{omitted} bytes omitted] ...\n".encode('utf-8')
+        return bytes(self._head) + marker + bytes(self._tail)
+    
+    def text(self) -> str:
+        return self.getvalue().decode('utf-8', 'replace')
+
+
+class OutputCapture:
+    
+    def __init__(self, log_path: Optional[str] = None, head_bytes: int = DEFAULT_HEAD_BYTES,
+                 tail_bytes: int = DEFAULT_TAIL_BYTES):
+        self.log_path = log_path
+        self.stdout = BoundedBuffer(head_bytes, tail_bytes)
+        self.stderr = BoundedBuffer(head_bytes, tail_bytes)
+        self._lock = threading.Lock()
+        self._log_file = None
+        
+        if log_path:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            self._log_file = open(log_path, 'wb')
+    
+    def feed(self, buffer: BoundedBuffer, chunk: bytes):
+        with self._lock:
+            buffer.feed(chunk)
+            if self._log_file is not None:
+                self._log_file.write(chunk)
+    
+    def pump(self, stream, buffer: BoundedBuffer):
+        fd = stream.fileno()
+        while True:
+            chunk = os.read(fd, READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            self.feed(buffer, chunk)
+    
+    async def pump_async(self, reader, buffer: BoundedBuffer):
+        while True:
+            chunk = await reader.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            self.feed(buffer, chunk)
+    
+    def close(self):
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+    
+    def result_fields(self) -> Dict[str, any]:
+        return {
+            "stdout": self.stdout.text(),
+            "stderr": self.stderr.text(),
+            "stdout_bytes": self.stdout.total_bytes,
+            "stderr_bytes": self.stderr.total_bytes,
+            "output_truncated": self.stdout.truncated or self.stderr.truncated,
+            "output_path": self.log_path
+        }
+
+
+def run_log_path(output_dir: str, job_name: str, start_time: float) -> str:
+    stamp = datetime.fromtimestamp(start_time).strftime("%Y%m%d-%H%M%S-%f")
+    return os.path.join(output_dir, safe_filename(job_name), f"{stamp}.log")
+
+
+def prune_run_logs(job_dir: str, keep: int):
+    try:
+        names = sorted(name for name in os.listdir(job_dir) if name.endswith('.log'))
+    except OSError:
+        return
+    
+    for name in names[:max(0, len(names) - keep)]:
+        try:
+            os.remove(os.path.join(job_dir, name))
+        except OSError:
+            pass
@@ -1,8 +1,14 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
 import time
 import signal
 import sys
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
+from datetime import datetime
 
 from smartcron.monitor.system_metrics import SystemMonitor
 from smartcron.ai.model import AIPredictor
@@ -19,95 +25,270 @@ class SmartCronScheduler:
                  model_path: str = "models/model.pkl",
                  db_path: str = "/var/lib/smartcron/logs.db",
                  log_dir: str = "/var/log/smartcron",
-                 check_interval: int = 60):
+                 check_interval: int = 60,
+                 reload_interval: int = 300,
+                 sample_interval: Optional[float] = None,
+                 max_parallel_jobs: Optional[int] = None,
+                 group_limits: Optional[Dict[str, int]] = None):
         
         self.config_dir = config_dir
         self.check_interval = check_interval
+        self.reload_interval = reload_interval
         self.running = False
         
         self.logger = SmartCronLogger(db_path=db_path, log_dir=log_dir)
         self.logger.info("Initializing SmartCron Scheduler")
         
-        self.system_monitor = SystemMonitor()
+        self.system_monitor = SystemMonitor(sampler_interval=sample_interval)
         self.ai_predictor = AIPredictor(model_path=model_path)
         self.decision_engine = DecisionEngine(
             ai_predictor=self.ai_predictor,
-            system_monitor=self.system_monitor
+            system_monitor=self.system_monitor,
+            history=self.logger
+        )
+        self.concurrent = bool(max_parallel_jobs)
+        self.job_executor = JobExecutor(
+            logger=self.logger,
+            max_parallel_jobs=max_parallel_jobs,
+            group_limits=group_limits,
+            on_complete=self.wake,
+            output_dir=os.path.join(log_dir, "runs")
         )
-        self.job_executor = JobExecutor(logger=self.logger)
         self.job_parser = JobConfigParser(config_dir=config_dir)
         
         self.jobs: List[JobConfig] = []
         self.last_job_load_time = 0
+        self._active_jobs: Dict[str, JobConfig] = {}
+        self._newly_eligible: Dict[str, JobConfig] = {}
+        self._waiting_jobs = []
+        self._waiting_seq = itertools.count()
+        self._config_signature = None
+        self._reload_requested = False
+        
+        self._wakeup = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake_event: Optional[asyncio.Event] = None
         
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self._reload_signal_handler)
     
     def _signal_handler(self, signum, frame):
         self.logger.info(f"Received signal {signum}, shutting down gracefully...")
         self.running = False
+        self.wake()
+    
+    def _reload_signal_handler(self, signum, frame):
+        self.logger.info(f"Received signal {signum}, reloading job configurations...")
+        self._reload_requested = True
+        self.wake()
+    
+    def wake(self):
+        loop = self._loop
+        if loop is not None and self._wake_event is not None:
+            loop.call_soon_threadsafe(self._wake_event.set)
+        else:
+            self._wakeup.set()
+    
+    def _defer_job(self, job: JobConfig, defer_until: float):
+        self.decision_engine.add_deferred_job(job, defer_until)
     
     def load_jobs(self):
         try:
+            previous = {job.job_name: job for job in self.jobs}
+            self._config_signature = self.job_parser.config_signature()
             self.jobs = self.job_parser.load_all_jobs()
+            for job in self.jobs:
+                if job.job_name in previous:
+                    job.copy_runtime_state(previous[job.job_name])
             self.last_job_load_time = time.time()
+            self._index_jobs(self.last_job_load_time)
             self.logger.info(f"Loaded {len(self.jobs)} job(s)")
             for job in self.jobs:
                 self.logger.debug(f"  - {job.job_name}")
         except Exception as e:
             self.logger.error(f"Error loading jobs: {e}")
     
-    def reload_jobs_if_needed(self):
-        if time.time() - self.last_job_load_time > 300:
-            self.logger.debug("Reloading job configurations...")
-            self.load_jobs()
+    def _index_jobs(self, now: float):
+        self._active_jobs = {}
+        self._newly_eligible = {}
+        self._waiting_jobs = []
+        for job in self.jobs:
+            self._index_job(job, now)
     
-    def process_jobs(self):
-        self.reload_jobs_if_needed()
+    def _index_job(self, job: JobConfig, now: float):
+        eligible_at = job.next_eligible_time(now)
+        if eligible_at is None:
+            return
+        if eligible_at <= now:
+            self._active_jobs[job.job_name] = job
+        else:
+            heapq.heappush(self._waiting_jobs, (eligible_at, next(self._waiting_seq), job))
+    
+    def _refresh_job_index(self, now: float):
+        while self._waiting_jobs and self._waiting_jobs[0][0] <= now:
+            job = heapq.heappop(self._waiting_jobs)[2]
+            self._index_job(job, now)
+            if job.job_name in self._active_jobs:
+                self._newly_eligible[job.job_name] = job
         
+        for job_name, job in list(self._active_jobs.items()):
+            if not job.is_eligible_at(datetime.fromtimestamp(now)):
+                del self._active_jobs[job_name]
+                self._newly_eligible.pop(job_name, None)
+                self._index_job(job, now)
+    
+    def reload_jobs_if_needed(self) -> bool:
+        now = time.time()
+        requested = self._reload_requested
+        if not requested and now - self.last_job_load_time < self.reload_interval:
+            return False
+        
+        self._reload_requested = False
+        if self.ai_predictor.reload_if_changed():
+            self.logger.info("AI model changed on disk, reloaded")
+        
+        if not requested and self.job_parser.config_signature() == self._config_signature:
+            self.last_job_load_time = now
+            return False
+        
+        self.logger.debug("Reloading job configurations...")
+        self.load_jobs()
+        return True
+    
+    def _handle_result(self, job: JobConfig, result: dict):
+        self.decision_engine.invalidate_job_history(job.job_name)
+        retry_at = result.get("retry_at")
+        
+        if retry_at is not None:
+            job.retry_count += 1
+            job.next_retry_time = retry_at
+            self._defer_job(job, retry_at)
+            self.logger.info(
+                f"Job {job.job_name} will be retried in {max(0.0, retry_at - time.time()):.0f}s "
+                f"(attempt {job.retry_count}/{job.max_retries})"
+            )
+        else:
+            job.retry_count = 0
+            job.next_retry_time = None
+            self.decision_engine.clear_deferred_job(job.job_name)
+    
+    def collect_finished_jobs(self):
+        for job, result in self.job_executor.collect_completed():
+            self._handle_result(job, result)
+    
+    def _jobs_to_check(self, include_scheduled: bool = True) -> List[JobConfig]:
+        now = time.time()
         ready_deferred = self.decision_engine.get_ready_deferred_jobs()
-        jobs_to_check = self.jobs + ready_deferred
+        
+        self._refresh_job_index(now)
+        candidates = self._active_jobs if include_scheduled else self._newly_eligible
+        scheduled = [
+            job for job in candidates.values()
+            if job.next_retry_time is None or job.next_retry_time <= now
+        ]
+        self._newly_eligible = {}
+        
+        ready_names = {job.job_name for job in ready_deferred}
+        jobs_to_check = [job for job in scheduled if job.job_name not in ready_names] + ready_deferred
+        
+        if self.concurrent or self._loop is not None:
+            jobs_to_check = [job for job in jobs_to_check if not self.job_executor.is_running(job.job_name)]
+        
+        return jobs_to_check
+    
+    def process_jobs(self, full_tick: bool = True):
+        self.reload_jobs_if_needed()
+        
+        if self.concurrent:
+            self.collect_finished_jobs()
+        
+        jobs_to_check = self._jobs_to_check(include_scheduled=full_tick)
         
         if not jobs_to_check:
             return
         
-        system_metrics = self.system_monitor.get_all_metrics()
+        system_metrics = self.system_monitor.snapshot()
         self.logger.log_system_snapshot(system_metrics)
         
-        prioritized = self.decision_engine.prioritize_jobs(jobs_to_check)
+        prioritized = self.decision_engine.prioritize_jobs(jobs_to_check, system_metrics)
         
         for item in prioritized:
             job = item["job"]
             decision = item["decision"]
             
             if decision["should_run"]:
+                if self.concurrent:
+                    if self.job_executor.is_running(job.job_name):
+                        continue
+                    if self.job_executor.submit(job, system_metrics):
+                        job.advance_schedule(time.time())
+                        self.logger.info(f"Launched job: {job.job_name} (score={decision['score']:.2f}, reason={decision['reason']})")
+                    else:
+                        self.logger.debug(f"Job {job.job_name} waiting for a free execution slot")
+                    continue
+                
                 self.logger.info(f"Running job: {job.job_name} (score={decision['score']:.2f}, reason={decision['reason']})")
                 
+                job.advance_schedule(time.time())
                 result = self.job_executor.execute_with_retry(job, system_metrics)
-                
-                if not result["success"] and job.retry_on_fail and job.retry_count < job.max_retries:
-                    job.retry_count += 1
-                    self.decision_engine.add_deferred_job(job, time.time() + 300)
-                    self.logger.info(f"Job {job.job_name} will be retried (attempt {job.retry_count}/{job.max_retries})")
-                else:
-                    job.retry_count = 0
-                    self.decision_engine.clear_deferred_job(job.job_name)
+                self._handle_result(job, result)
                 
             elif decision.get("defer_until"):
                 self.logger.debug(f"Deferring job: {job.job_name} (reason={decision['reason']})")
                 self.decision_engine.add_deferred_job(job, decision["defer_until"])
     
+    def _next_tick_time(self, now: float) -> float:
+        self._refresh_job_index(now)
+        
+        if self._active_jobs:
+            next_tick = now + self.check_interval
+        else:
+            next_tick = self.last_job_load_time + self.reload_interval
+        
+        return next_tick
+    
+    def _after_tick(self, full_tick: bool, next_tick: float) -> float:
+        following = self._next_tick_time(time.time())
+        return following if full_tick else min(next_tick, following)
+    
+    def _seconds_until_next_wakeup(self, next_tick: float) -> float:
+        if self._newly_eligible:
+            return 0.0
+        
+        wakeup = min(next_tick, self.last_job_load_time + self.reload_interval)
+        
+        if self._waiting_jobs:
+            wakeup = min(wakeup, self._waiting_jobs[0][0])
+        
+        next_deferred = self.decision_engine.next_deferred_time()
+        if next_deferred is not None:
+            wakeup = min(wakeup, next_deferred)
+        
+        return max(0.0, wakeup - time.time())
+    
     def run(self):
         self.logger.info("SmartCron Scheduler started")
         self.running = True
         
+        self.system_monitor.start_sampler()
         self.load_jobs()
         
+        next_tick = 0.0
+        
         while self.running:
             try:
-                self.process_jobs()
+                if self.reload_jobs_if_needed():
+                    next_tick = min(next_tick, self._next_tick_time(time.time()))
+                full_tick = time.time() >= next_tick
                 
-                time.sleep(self.check_interval)
+                self.process_jobs(full_tick)
+                
+                next_tick = self._after_tick(full_tick, next_tick)
+                
+                self._wakeup.wait(self._seconds_until_next_wakeup(next_tick))
+                self._wakeup.clear()
                 
             except KeyboardInterrupt:
                 break
@@ -117,7 +298,114 @@ class SmartCronScheduler:
                 self.logger.error(traceback.format_exc())
                 time.sleep(self.check_interval)
         
+        if self.concurrent:
+            running = self.job_executor.running_count()
+            if running:
+                self.logger.info(f"Waiting for {running} running job(s) to finish...")
+            self.job_executor.shutdown(wait=True)
+            self.collect_finished_jobs()
+        
+        self.system_monitor.stop_sampler()
         self.logger.info("SmartCron Scheduler stopped")
+        self.logger.flush()
+    
+    async def process_jobs_async(self, full_tick: bool = True):
+        self.reload_jobs_if_needed()
+        self.collect_finished_jobs()
+        
+        jobs_to_check = self._jobs_to_check(include_scheduled=full_tick)
+        
+        if not jobs_to_check:
+            return
+        
+        system_metrics = await self._loop.run_in_executor(None, self.system_monitor.snapshot)
+        self.logger.log_system_snapshot(system_metrics)
+        
+        prioritized = self.decision_engine.prioritize_jobs(jobs_to_check, system_metrics)
+        
+        for item in prioritized:
+            job = item["job"]
+            decision = item["decision"]
+            
+            if decision["should_run"]:
+                if self.job_executor.is_running(job.job_name):
+                    continue
+                
+                task = self.job_executor.submit_async(job, system_metrics)
+                if task is None:
+                    self.logger.debug(f"Job {job.job_name} waiting for a free execution slot")
+                    continue
+                
+                task.add_done_callback(lambda _: self.wake())
+                job.advance_schedule(time.time())
+                self.logger.info(f"Launched job: {job.job_name} (score={decision['score']:.2f}, reason={decision['reason']})")
+                
+            elif decision.get("defer_until"):
+                self.logger.debug(f"Deferring job: {job.job_name} (reason={decision['reason']})")
+                self._defer_job(job, decision["defer_until"])
+    
+    async def run_async(self):
+        self.logger.info("SmartCron Scheduler started (asyncio mode)")
+        self.running = True
+        
+        self._loop = asyncio.get_running_loop()
+        self._wake_event = asyncio.Event()
+        
+        handlers = {signal.SIGINT: self._signal_handler, signal.SIGTERM: self._signal_handler}
+        if hasattr(signal, "SIGHUP"):
+            handlers[signal.SIGHUP] = self._reload_signal_handler
+        
+        for signum, handler in handlers.items():
+            try:
+                self._loop.add_signal_handler(signum, handler, signum, None)
+            except (NotImplementedError, RuntimeError):
+                pass
+        
+        self.system_monitor.start_sampler()
+        self.load_jobs()
+        
+        next_tick = 0.0
+        
+        try:
+            while self.running:
+                try:
+                    if self.reload_jobs_if_needed():
+                        next_tick = min(next_tick, self._next_tick_time(time.time()))
+                    full_tick = time.time() >= next_tick
+                    
+                    await self.process_jobs_async(full_tick)
+                    
+                    next_tick = self._after_tick(full_tick, next_tick)
+                except Exception as e:
+                    self.logger.error(f"Error in scheduler loop: {e}")
+                    import traceback
+                    self.logger.error(traceback.format_exc())
+                    next_tick = time.time() + self.check_interval
+                
+                try:
+                    await asyncio.wait_for(self._wake_event.wait(), timeout=self._seconds_until_next_wakeup(next_tick))
+                except asyncio.TimeoutError:
+                    pass
+                self._wake_event.clear()
+            
+            tasks = [entry["future"] for entry in list(self.job_executor.running_jobs.values())]
+            if tasks:
+                self.logger.info(f"Waiting for {len(tasks)} running job(s) to finish...")
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self.collect_finished_jobs()
+        finally:
+            for signum in handlers:
+                try:
+                    self._loop.remove_signal_handler(signum)
+                except (NotImplementedError, RuntimeError):
+                    pass
+            
+            self._loop = None
+            self._wake_event = None
+            self.system_monitor.stop_sampler()
+        
+        self.logger.info("SmartCron Scheduler stopped")
+        self.logger.flush()
     
     def run_job_now(self, job_name: str) -> bool:
         job = next((j for j in self.jobs if j.job_name == job_name), None)
@@ -126,32 +414,38 @@ class SmartCronScheduler:
             return False
         
         self.logger.info(f"Force running job: {job_name}")
-        system_metrics = self.system_monitor.get_all_metrics()
+        system_metrics = self.system_monitor.snapshot()
         result = self.job_executor.execute_with_retry(job, system_metrics)
+        self._handle_result(job, result)
         
         return result["success"]
     
     def get_status(self) -> dict:
-        system_metrics = self.system_monitor.get_all_metrics()
+        system_metrics = self.system_monitor.snapshot()
         
         job_statuses = []
         for job in self.jobs:
-            decision = self.decision_engine.should_run_job(job)
+            decision = self.decision_engine.should_run_job(job, system_metrics=system_metrics)
             job_statuses.append({
                 "name": job.job_name,
                 "enabled": job.enabled,
                 "ai_aware": job.ai_aware,
                 "last_run": job.last_run_time,
                 "last_success": job.last_run_success,
+                "next_fire": job.next_fire_time,
                 "decision": decision
             })
         
         return {
             "running": self.running,
             "jobs_loaded": len(self.jobs),
+            "jobs_eligible": len(self._active_jobs),
             "system_metrics": system_metrics,
             "jobs": job_statuses,
-            "deferred_jobs": len(self.decision_engine.deferred_jobs)
+            "running_jobs": self.job_executor.get_running_jobs(),
+            "deferred_jobs": len(self.decision_engine.deferred_jobs),
+            "prediction_cache": self.ai_predictor.cache_stats(),
+            "job_models": self.ai_predictor.job_model_stats()
         }
 
 
@@ -165,10 +459,28 @@ def main():
     parser.add_argument("--db", default="/var/lib/smartcron/logs.db", help="Database path")
     parser.add_argument("--log-dir", default="/var/log/smartcron", help="Log directory")
     parser.add_argument("--interval", type=int, default=60, help="Check interval in seconds")
+    parser.add_argument("--reload-interval", type=int, default=300,
+                        help="Seconds between checks for job configuration changes")
+    parser.add_argument("--sample-interval", type=float, help="Run a background metrics sampler every N seconds")
+    parser.add_argument("--max-parallel", type=int, help="Run up to N jobs concurrently")
+    parser.add_argument("--group-limit", action="append", default=[], metavar="GROUP=N",
+                        help="Limit concurrent jobs in a job_group (repeatable)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run the scheduler on an asyncio event loop")
     parser.add_argument("--daemon", action="store_true", help="Run as daemon")
     
     args = parser.parse_args()
     
+    group_limits = {}
+    for spec in args.group_limit:
+        group, _, limit = spec.partition("=")
+        if not group or not limit.isdigit():
+            parser.error(f"Invalid --group-limit value: {spec}")
+        group_limits[group] = int(limit)
+    
+    if group_limits and not args.max_parallel and not args.use_async:
+        parser.error("--group-limit requires --max-parallel (or --async)")
+    
     if os.geteuid() != 0:
         if args.config_dir == "/etc/smartcron/jobs":
             args.config_dir = "./jobs"
@@ -182,10 +494,17 @@ def main():
         model_path=args.model,
         db_path=args.db,
         log_dir=args.log_dir,
-        check_interval=args.interval
+        check_interval=args.interval,
+        reload_interval=args.reload_interval,
+        sample_interval=args.sample_interval,
+        max_parallel_jobs=args.max_parallel,
+        group_limits=group_limits
     )
     
-    scheduler.run()
+    if args.use_async:
+        asyncio.run(scheduler.run_async())
+    else:
+        scheduler.run()
 
 
 if __name__ == "__main__":
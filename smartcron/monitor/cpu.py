@@ -0,0 +1,85 @@
+from typing import Dict, List, Optional, Tuple
+
+
+CPU_TIME_FIELDS = (
+    "user",
+    "nice",
+    "system",
+    "idle",
+    "iowait",
+    "irq",
+    "softirq",
+    "steal",
+    "guest",
+    "guest_nice"
+)
+
+IDLE = 3
+IOWAIT = 4
+STEAL = 7
+
+
+class CpuAccounting:
+    
+    def __init__(self, stat_path: str = '/proc/stat'):
+        self.stat_path = stat_path
+        self._previous: Optional[Dict[str, Tuple[int, ...]]] = None
+        self._last_result: Optional[Dict[str, any]] = None
+    
+    def read_times(self) -> Dict[str, Tuple[int, ...]]:
+        times = {}
+        with open(self.stat_path, 'r') as f:
+            for line in f:
+                if not line.startswith('cpu'):
+                    break
+                fields = line.split()
+                values = [int(x) for x in fields[1:len(CPU_TIME_FIELDS) + 1]]
+                values.extend([0] * (len(CPU_TIME_FIELDS) - len(values)))
+                times[fields[0]] = tuple(values)
+        return times
+    
+    @staticmethod
+    def _utilisation(current: Tuple[int, ...], previous: Optional[Tuple[int, ...]]) -> Dict[str, float]:
+        if previous is not None:
+            deltas = [max(0, c - p) for c, p in zip(current, previous)]
+        else:
+            deltas = list(current)
+        
+        total = sum(deltas[:8])
+        if total <= 0:
+            return {"percent": 0.0, "iowait": 0.0, "steal": 0.0}
+        
+        busy = total - deltas[IDLE] - deltas[IOWAIT]
+        return {
+            "percent": 100.0 * busy / total,
+            "iowait": 100.0 * deltas[IOWAIT] / total,
+            "steal": 100.0 * deltas[STEAL] / total
+        }
+    
+    def prime(self):
+        self._previous = self.read_times()
+    
+    def sample(self) -> Dict[str, any]:
+        current = self.read_times()
+        previous = self._previous or {}
+        
+        if self._last_result is not None and current["cpu"] == previous.get("cpu"):
+            return self._last_result
+        self._previous = current
+        
+        overall = self._utilisation(current["cpu"], previous.get("cpu"))
+        
+        per_core: List[float] = []
+        core = 0
+        while f"cpu{core}" in current:
+            name = f"cpu{core}"
+            per_core.append(self._utilisation(current[name], previous.get(name))["percent"])
+            core += 1
+        
+        self._last_result = {
+            "cpu_percent": overall["percent"],
+            "iowait_percent": overall["iowait"],
+            "steal_percent": overall["steal"],
+            "per_core_percent": per_core
+        }
+        return self._last_result
@@ -0,0 +1,189 @@
+import os
+import struct
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+
+UTMP_RECORD = struct.Struct("<hxxi32s4s32s256shhiii4i20s")
+USER_PROCESS = 7
+
+INPUT_IRQ_NAMES = ("i8042", "keyboard", "mouse", "hid", "input", "touchpad")
+
+
+def read_uptime(uptime_path: str = '/proc/uptime') -> float:
+    with open(uptime_path, 'r') as f:
+        return float(f.read().split()[0])
+
+
+class IdleTimeProvider(ABC):
+    
+    name = "base"
+    
+    @abstractmethod
+    def available(self) -> bool:
+        pass
+    
+    @abstractmethod
+    def get_idle_seconds(self) -> Optional[float]:
+        pass
+
+
+class UtmpIdleProvider(IdleTimeProvider):
+    
+    name = "utmp"
+    
+    def __init__(self, utmp_path: Optional[str] = None, dev_dir: str = '/dev',
+                 uptime_path: str = '/proc/uptime'):
+        if utmp_path is None:
+            utmp_path = '/run/utmp' if os.path.exists('/run/utmp') else '/var/run/utmp'
+        self.utmp_path = utmp_path
+        self.dev_dir = dev_dir
+        self.uptime_path = uptime_path
+    
+    def available(self) -> bool:
+        return os.access(self.utmp_path, os.R_OK)
+    
+    def session_lines(self) -> List[str]:
+        lines = []
+        with open(self.utmp_path, 'rb') as f:
+            data = f.read()
+        
+        for offset in range(0, len(data) - UTMP_RECORD.size + 1, UTMP_RECORD.size):
+            record = UTMP_RECORD.unpack_from(data, offset)
+            if record[0] != USER_PROCESS:
+                continue
+            line = record[2].split(b'\0', 1)[0].decode('utf-8', 'replace')
+            if line:
+                lines.append(line)
+        
+        return lines
+    
+    def get_idle_seconds(self) -> Optional[float]:
+        lines = self.session_lines()
+        if not lines:
+            return read_uptime(self.uptime_path)
+        
+        now = time.time()
+        idle_times = []
+        for line in lines:
+            try:
+                atime = os.stat(os.path.join(self.dev_dir, line)).st_atime
+            except OSError:
+                continue
+            idle_times.append(max(0.0, now - atime))
+        
+        return min(idle_times) if idle_times else None
+
+
+class PtsIdleProvider(IdleTimeProvider):
+    
+    name = "pts"
+    
+    def __init__(self, pts_dir: str = '/dev/pts'):
+        self.pts_dir = pts_dir
+    
+    def _terminals(self) -> List[str]:
+        try:
+            return [entry for entry in os.listdir(self.pts_dir) if entry.isdigit()]
+        except OSError:
+            return []
+    
+    def available(self) -> bool:
+        return bool(self._terminals())
+    
+    def get_idle_seconds(self) -> Optional[float]:
+        now = time.time()
+        idle_times = []
+        for entry in self._terminals():
+            try:
+                atime = os.stat(os.path.join(self.pts_dir, entry)).st_atime
+            except OSError:
+                continue
+            idle_times.append(max(0.0, now - atime))
+        
+        return min(idle_times) if idle_times else None
+
+
+class InterruptsIdleProvider(IdleTimeProvider):
+    
+    name = "interrupts"
+    
+    def __init__(self, interrupts_path: str = '/proc/interrupts'):
+        self.interrupts_path = interrupts_path
+        self._last_count = None
+        self._last_activity = None
+    
+    def _input_interrupt_count(self) -> Optional[int]:
+        total = 0
+        found = False
+        
+        with open(self.interrupts_path, 'r') as f:
+            f.readline()
+            for line in f:
+                lowered = line.lower()
+                if not any(name in lowered for name in INPUT_IRQ_NAMES):
+                    continue
+                found = True
+                for field in line.split()[1:]:
+                    if not field.isdigit():
+                        break
+                    total += int(field)
+        
+        return total if found else None
+    
+    def available(self) -> bool:
+        try:
+            return self._input_interrupt_count() is not None
+        except OSError:
+            return False
+    
+    def get_idle_seconds(self) -> Optional[float]:
+        count = self._input_interrupt_count()
+        if count is None:
+            return None
+        
+        now = time.time()
+        if self._last_count is None or count != self._last_count:
+            self._last_count = count
+            self._last_activity = now
+        
+        return now - self._last_activity
+
+
+class IdleTimeDetector:
+    
+    def __init__(self, providers: Optional[List[IdleTimeProvider]] = None):
+        if providers is None:
+            providers = [UtmpIdleProvider(), PtsIdleProvider(), InterruptsIdleProvider()]
+        self.providers = providers
+        self.provider: Optional[IdleTimeProvider] = None
+        self._probed = False
+    
+    def probe(self) -> Optional[IdleTimeProvider]:
+        self.provider = None
+        for provider in self.providers:
+            try:
+                if provider.available():
+                    self.provider = provider
+                    break
+            except Exception:
+                continue
+        
+        self._probed = True
+        return self.provider
+    
+    def get_idle_seconds(self) -> Optional[int]:
+        if not self._probed:
+            self.probe()
+        
+        if self.provider is None:
+            return None
+        
+        try:
+            idle = self.provider.get_idle_seconds()
+        except Exception:
+            self._probed = False
+            return None
+        
+        return int(idle) if idle is not None else None
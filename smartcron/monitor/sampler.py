@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from smartcron.monitor.cpu import CpuAccounting
+
+
+RECORD_FIELDS = (
+    "timestamp",
+    "cpu_percent",
+    "cpu_iowait_percent",
+    "cpu_steal_percent",
+    "load_1m",
+    "load_5m",
+    "load_15m",
+    "mem_total_kb",
+    "mem_available_kb",
+    "disk_total_bytes",
+    "disk_free_bytes"
+)
+
+FIELD_INDEX = {name: index for index, name in enumerate(RECORD_FIELDS)}
+
+
+class MetricsRingBuffer:
+    
+    def __init__(self, capacity: int = 300):
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1")
+        
+        self.capacity = capacity
+        self.width = len(RECORD_FIELDS)
+        self._data = array('d', [0.0]) * (capacity * self.width)
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+    
+    def append(self, record) -> None:
+        offset = (self._count % self.capacity) * self.width
+        self._data[offset:offset + self.width] = array('d', record)
+        self._count += 1
+    
+    def latest(self) -> Optional[Dict[str, float]]:
+        count = self._count
+        if count == 0:
+            return None
+        
+        offset = ((count - 1) % self.capacity) * self.width
+        values = self._data[offset:offset + self.width]
+        return dict(zip(RECORD_FIELDS, values))
+    
+    def records(self) -> List[array]:
+        count = self._count
+        available = min(count, self.capacity)
+        
+        records = []
+        for seq in range(count - available, count):
+            offset = (seq % self.capacity) * self.width
+            records.append(self._data[offset:offset + self.width])
+        
+        overwritten = max(0, self._count - count - (self.capacity - available))
+        return records[overwritten:]
+    
+    def mean(self, field: str, window_sec: float, now: Optional[float] = None) -> Optional[float]:
+        index = FIELD_INDEX[field]
+        
+        records = self.records()
+        if not records:
+            return None
+        
+        if now is None:
+            now = records[-1][0]
+        cutoff = now - window_sec
+        
+        values = [record[index] for record in records if record[0] >= cutoff]
+        if not values:
+            return None
+        
+        return sum(values) / len(values)
+
+
+class MetricsSampler:
+    
+    def __init__(self, interval: float = 1.0, capacity: int = 300, disk_path: str = '/',
+                 cpu_accounting: Optional[CpuAccounting] = None):
+        self.interval = interval
+        self.disk_path = disk_path
+        self.buffer = MetricsRingBuffer(capacity)
+        
+        if cpu_accounting is None:
+            cpu_accounting = CpuAccounting()
+            cpu_accounting.prime()
+        self.cpu_accounting = cpu_accounting
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        if self.is_running():
+            return
+        
+        self.sample_once()
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="smartcron-sampler", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception:
+                pass
+    
+    def _read_memory(self):
+        total_kb = 0
+        available_kb = None
+        free_kb = 0
+        
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    total_kb = int(line.split()[1])
+                elif line.startswith('MemAvailable:'):
+                    available_kb = int(line.split()[1])
+                elif line.startswith('MemFree:'):
+                    free_kb = int(line.split()[1])
+                if total_kb and available_kb is not None:
+                    break
+        
+        return total_kb, available_kb if available_kb is not None else free_kb
+    
+    def _read_loadavg(self):
+        with open('/proc/loadavg', 'r') as f:
+            fields = f.read().split()
+        return float(fields[0]), float(fields[1]), float(fields[2])
+    
+    def sample_once(self) -> Dict[str, float]:
+        cpu = self.cpu_accounting.sample()
+        load_1m, load_5m, load_15m = self._read_loadavg()
+        mem_total_kb, mem_available_kb = self._read_memory()
+        
+        stat = os.statvfs(self.disk_path)
+        
+        record = (
+            time.time(),
+            cpu["cpu_percent"],
+            cpu["iowait_percent"],
+            cpu["steal_percent"],
+            load_1m,
+            load_5m,
+            load_15m,
+            mem_total_kb,
+            mem_available_kb,
+            stat.f_blocks * stat.f_frsize,
+            stat.f_bavail * stat.f_frsize
+        )
+        self.buffer.append(record)
+        
+        return dict(zip(RECORD_FIELDS, record))
+    
+    def latest(self) -> Optional[Dict[str, float]]:
+        return self.buffer.latest()
+    
+    def mean(self, field: str, window_sec: float) -> Optional[float]:
+        return self.buffer.mean(field, window_sec, now=time.time())
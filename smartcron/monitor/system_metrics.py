@@ -1,6 +1,6 @@
 import os
 import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 try:
     import psutil
@@ -8,15 +8,104 @@ try:
 except ImportError:
     HAS_PSUTIL = False
 
+from smartcron.monitor.cpu import CpuAccounting
+from smartcron.monitor.idle import IdleTimeDetector
+from smartcron.monitor.sampler import MetricsSampler
+
+
+class MetricsSnapshot(dict):
+    
+    def __init__(self, metrics: Dict[str, any]):
+        super().__init__({
+            key: MetricsSnapshot(value) if isinstance(value, dict) else value
+            for key, value in metrics.items()
+        })
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("MetricsSnapshot is immutable")
+    
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    __ior__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+    
+    def __reduce__(self):
+        return (MetricsSnapshot, (dict(self),))
+
 
 class SystemMonitor:
     
-    def __init__(self):
+    def __init__(self, sampler_interval: Optional[float] = None, sampler_capacity: int = 300,
+                 cpu_window_sec: float = 30.0, cpu_mode: Optional[str] = None,
+                 idle_detector: Optional[IdleTimeDetector] = None):
         self.last_check_time = time.time()
+        self.cpu_window_sec = cpu_window_sec
+        self.idle_detector = idle_detector or IdleTimeDetector()
+        
+        if cpu_mode is None:
+            cpu_mode = "delta" if os.path.exists('/proc/stat') else "psutil"
+        if cpu_mode not in ("delta", "psutil"):
+            raise ValueError(f"Unknown CPU mode: {cpu_mode}")
+        self.cpu_mode = cpu_mode
+        self.cpu_accounting = None
+        if cpu_mode == "delta":
+            self.cpu_accounting = CpuAccounting()
+            self.cpu_accounting.prime()
+        
+        self.sampler = None
+        if sampler_interval:
+            self.sampler = MetricsSampler(interval=sampler_interval, capacity=sampler_capacity,
+                                          cpu_accounting=self.cpu_accounting)
+    
+    def start_sampler(self):
+        if self.sampler:
+            self.sampler.start()
+    
+    def stop_sampler(self):
+        if self.sampler:
+            self.sampler.stop()
+    
+    def _latest_sample(self) -> Optional[Dict[str, float]]:
+        if self.sampler and self.sampler.is_running():
+            return self.sampler.latest()
+        return None
+    
+    def get_window_average(self, field: str, window_sec: Optional[float] = None) -> Optional[float]:
+        if not self.sampler or not self.sampler.is_running():
+            return None
+        return self.sampler.mean(field, window_sec if window_sec is not None else self.cpu_window_sec)
     
     def get_cpu_load(self) -> Dict[str, float]:
+        sample = self._latest_sample()
+        if sample is not None:
+            return {
+                "load_1m": sample["load_1m"],
+                "load_5m": sample["load_5m"],
+                "load_15m": sample["load_15m"],
+                "cpu_percent": sample["cpu_percent"],
+                "iowait_percent": sample["cpu_iowait_percent"],
+                "steal_percent": sample["cpu_steal_percent"],
+                "cpu_percent_avg": self.get_window_average("cpu_percent")
+            }
+        
         load_avg = os.getloadavg()
         
+        if self.cpu_accounting is not None:
+            usage = self.cpu_accounting.sample()
+            return {
+                "load_1m": load_avg[0],
+                "load_5m": load_avg[1],
+                "load_15m": load_avg[2],
+                "cpu_percent": usage["cpu_percent"],
+                "iowait_percent": usage["iowait_percent"],
+                "steal_percent": usage["steal_percent"],
+                "per_core_percent": usage["per_core_percent"]
+            }
+        
         if HAS_PSUTIL:
             cpu_percent = psutil.cpu_percent(interval=0.1)
         else:
@@ -35,6 +124,18 @@ class SystemMonitor:
         }
     
     def get_memory_usage(self) -> Dict[str, float]:
+        sample = self._latest_sample()
+        if sample is not None:
+            total_kb = sample["mem_total_kb"]
+            available_kb = sample["mem_available_kb"]
+            used_kb = total_kb - available_kb
+            return {
+                "total_mb": total_kb / 1024,
+                "available_mb": available_kb / 1024,
+                "used_mb": used_kb / 1024,
+                "percent": 100.0 * used_kb / total_kb if total_kb > 0 else 0.0
+            }
+        
         if HAS_PSUTIL:
             mem = psutil.virtual_memory()
             return {
@@ -98,6 +199,18 @@ class SystemMonitor:
                 return None
     
     def get_disk_usage(self, path: str = '/') -> Dict[str, float]:
+        sample = self._latest_sample()
+        if sample is not None and path == self.sampler.disk_path:
+            total = sample["disk_total_bytes"]
+            free = sample["disk_free_bytes"]
+            used = total - free
+            return {
+                "total_gb": total / (1024 ** 3),
+                "used_gb": used / (1024 ** 3),
+                "free_gb": free / (1024 ** 3),
+                "percent": 100.0 * used / total if total > 0 else 0.0
+            }
+        
         if HAS_PSUTIL:
             disk = psutil.disk_usage(path)
             return {
@@ -120,35 +233,7 @@ class SystemMonitor:
             }
     
     def get_user_idle_time(self) -> Optional[int]:
-        try:
-            import subprocess
-            result = subprocess.run(['xprintidle'], capture_output=True, text=True, timeout=2)
-            if result.returncode == 0:
-                return int(result.stdout.strip()) // 1000
-        except (subprocess.TimeoutExpired, FileNotFoundError, ValueError):
-            pass
-        
-        try:
-            idle_time = self._get_idle_time_from_proc()
-            return idle_time
-        except:
-            pass
-        
-        return None
-    
-    def _get_idle_time_from_proc(self) -> int:
-        try:
-            with open('/proc/uptime', 'r') as f:
-                uptime_seconds = float(f.read().split()[0])
-            
-            import subprocess
-            result = subprocess.run(['who', '-s'], capture_output=True, text=True, timeout=2)
-            if result.returncode == 0 and result.stdout.strip():
-                return 0
-            
-            return int(uptime_seconds)
-        except:
-            return 0
+        return self.idle_detector.get_idle_seconds()
     
     def get_all_metrics(self) -> Dict[str, any]:
         metrics = {
@@ -161,31 +246,45 @@ class SystemMonitor:
         }
         return metrics
     
-    def check_constraints(self, constraints: Dict[str, any]) -> bool:
-        metrics = self.get_all_metrics()
+    def snapshot(self) -> MetricsSnapshot:
+        return MetricsSnapshot(self.get_all_metrics())
+    
+    def get_constraint_failures(self, constraints: Dict[str, any],
+                                metrics: Optional[Dict[str, any]] = None) -> List[str]:
+        if metrics is None:
+            metrics = self.get_all_metrics()
+        
+        failures = []
         
         if "max_cpu" in constraints:
-            if metrics["cpu"]["cpu_percent"] > constraints["max_cpu"]:
-                return False
+            cpu_percent = metrics["cpu"].get("cpu_percent_avg")
+            if cpu_percent is None:
+                cpu_percent = metrics["cpu"]["cpu_percent"]
+            if cpu_percent > constraints["max_cpu"]:
+                failures.append(f"CPU {cpu_percent:.1f}% > {constraints['max_cpu']}%")
         
         if "max_memory_percent" in constraints:
             if metrics["memory"]["percent"] > constraints["max_memory_percent"]:
-                return False
+                failures.append(f"RAM {metrics['memory']['percent']:.1f}% > {constraints['max_memory_percent']}%")
         
         if "min_battery" in constraints:
             battery = metrics["battery"]
             if battery and not battery["is_charging"]:
                 if battery["percent"] < constraints["min_battery"]:
-                    return False
+                    failures.append(f"Battery {battery['percent']:.1f}% < {constraints['min_battery']}%")
         
         if "min_disk_free_gb" in constraints:
             if metrics["disk"]["free_gb"] < constraints["min_disk_free_gb"]:
-                return False
+                failures.append(f"Disk free {metrics['disk']['free_gb']:.1f}GB < {constraints['min_disk_free_gb']}GB")
         
         if "min_idle_time_sec" in constraints:
             idle_time = metrics["idle_time_sec"]
             if idle_time is not None and idle_time < constraints["min_idle_time_sec"]:
-                return False
+                failures.append(f"Idle {idle_time}s < {constraints['min_idle_time_sec']}s")
         
-        return True
+        return failures
+    
+    def check_constraints(self, constraints: Dict[str, any],
+                          metrics: Optional[Dict[str, any]] = None) -> bool:
+        return not self.get_constraint_failures(constraints, metrics)
 
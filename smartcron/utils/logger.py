@@ -1,60 +1,336 @@
+import atexit
+import hashlib
 import logging
+import queue
 import sqlite3
 import os
 import json
+import threading
+import zlib
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from pathlib import Path
 
+from smartcron.utils.stats import JOB_STATS_FIELDS, JobStats
+
+
+DEFAULT_MAX_OUTPUT_BYTES = 1024 * 1024
+
+STATE_FEATURE_COLUMNS = (
+    "avg_cpu_load_5m",
+    "cpu_percent",
+    "ram_percent_used",
+    "battery_level",
+    "is_charging",
+    "idle_time_sec"
+)
+
+JOB_EXECUTION_INSERT = f'''
+    INSERT INTO job_executions 
+    (job_name, start_time, end_time, exit_code, stdout_hash, stderr_hash, 
+     execution_time_sec, system_state, ai_decision_reason, success, timestamp,
+     {", ".join(STATE_FEATURE_COLUMNS)})
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {", ".join("?" for _ in STATE_FEATURE_COLUMNS)})
+'''
+
+JOB_OUTPUT_INSERT = '''
+    INSERT OR IGNORE INTO job_outputs (hash, data, size, truncated)
+    VALUES (?, ?, ?, ?)
+'''
+
+JOB_STATS_INSERT = f'''
+    INSERT OR REPLACE INTO job_stats ({", ".join(JOB_STATS_FIELDS)})
+    VALUES ({", ".join("?" for _ in JOB_STATS_FIELDS)})
+'''
+
+JOB_HISTORY_COLUMNS = (
+    "id, job_name, start_time, end_time, exit_code, execution_time_sec, system_state, "
+    "ai_decision_reason, success, timestamp, stdout_hash, stderr_hash"
+)
+
+SYSTEM_SNAPSHOT_INSERT = '''
+    INSERT INTO system_snapshots 
+    (timestamp, cpu_load, memory_percent, battery_percent, is_charging, idle_time_sec, metrics_json)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def state_features(system_state: Dict) -> tuple:
+    battery = system_state.get('battery')
+    return (
+        system_state.get('cpu', {}).get('load_5m', 0),
+        system_state.get('cpu', {}).get('cpu_percent', 0),
+        system_state.get('memory', {}).get('percent', 0),
+        battery.get('percent', 100) if battery else 100,
+        int(battery.get('is_charging', True)) if battery else 1,
+        system_state.get('idle_time_sec', 0) or 0
+    )
+
+
+def _create_base_tables(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_executions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_name TEXT NOT NULL,
+            start_time REAL NOT NULL,
+            end_time REAL,
+            exit_code INTEGER,
+            stdout TEXT,
+            stderr TEXT,
+            execution_time_sec REAL,
+            system_state TEXT,
+            ai_decision_reason TEXT,
+            success BOOLEAN,
+            timestamp TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS system_snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp REAL NOT NULL,
+            cpu_load REAL,
+            memory_percent REAL,
+            battery_percent REAL,
+            is_charging BOOLEAN,
+            idle_time_sec INTEGER,
+            metrics_json TEXT
+        )
+    ''')
+
+
+def _add_execution_indexes(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_job_executions_job_start
+        ON job_executions (job_name, start_time DESC, success, execution_time_sec)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_system_snapshots_timestamp
+        ON system_snapshots (timestamp)
+    ''')
+
+
+def encode_output(text: Optional[str],
+                  max_bytes: int = DEFAULT_MAX_OUTPUT_BYTES) -> Optional[Tuple[str, bytes, int, bool]]:
+    if not text:
+        return None
+    
+    data = text.encode('utf-8', 'replace')
+    size = len(data)
+    truncated = size > max_bytes
+    if truncated:
+        half = max_bytes // 2
+        marker = f"\n... [{size - 2 * half} bytes truncated] ...\n".encode('utf-8')
+        data = data[:half] + marker + data[size - half:]
+    
+    digest = hashlib.sha256(data).hexdigest()
+    return digest, zlib.compress(data, 6), size, truncated
+
+
+def decode_output(data: Optional[bytes]) -> Optional[str]:
+    if data is None:
+        return None
+    return zlib.decompress(data).decode('utf-8', 'replace')
+
+
+def _move_output_to_blob_store(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_outputs (
+            hash TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            truncated BOOLEAN NOT NULL
+        )
+    ''')
+    conn.execute("ALTER TABLE job_executions ADD COLUMN stdout_hash TEXT")
+    conn.execute("ALTER TABLE job_executions ADD COLUMN stderr_hash TEXT")
+    
+    last_id = 0
+    while True:
+        rows = conn.execute('''
+            SELECT id, stdout, stderr FROM job_executions
+            WHERE id > ? AND (stdout IS NOT NULL OR stderr IS NOT NULL)
+            ORDER BY id
+            LIMIT 1000
+        ''', (last_id,)).fetchall()
+        if not rows:
+            break
+        
+        outputs = []
+        updates = []
+        for row_id, stdout, stderr in rows:
+            stdout_blob = encode_output(stdout)
+            stderr_blob = encode_output(stderr)
+            outputs.extend(blob for blob in (stdout_blob, stderr_blob) if blob)
+            updates.append((
+                stdout_blob[0] if stdout_blob else None,
+                stderr_blob[0] if stderr_blob else None,
+                row_id
+            ))
+        
+        conn.executemany(JOB_OUTPUT_INSERT, outputs)
+        conn.executemany('''
+            UPDATE job_executions
+            SET stdout_hash = ?, stderr_hash = ?, stdout = NULL, stderr = NULL
+            WHERE id = ?
+        ''', updates)
+        last_id = rows[-1][0]
+
+
+def _add_job_stats(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_stats (
+            job_name TEXT PRIMARY KEY,
+            total_runs INTEGER NOT NULL,
+            success_count INTEGER NOT NULL,
+            failure_count INTEGER NOT NULL,
+            success_streak INTEGER NOT NULL,
+            failure_streak INTEGER NOT NULL,
+            last_run_time REAL,
+            last_success_time REAL,
+            last_failure_time REAL,
+            runtime_count INTEGER NOT NULL,
+            runtime_total REAL NOT NULL,
+            runtime_max REAL,
+            runtime_ewma REAL,
+            runtime_sketch TEXT,
+            recent_outcomes INTEGER NOT NULL,
+            recent_count INTEGER NOT NULL
+        )
+    ''')
+    
+    stats = {}
+    cursor = conn.execute('''
+        SELECT job_name, success, execution_time_sec, COALESCE(end_time, start_time)
+        FROM job_executions
+        ORDER BY job_name, start_time
+    ''')
+    for job_name, success, execution_time, end_time in cursor:
+        if job_name not in stats:
+            stats[job_name] = JobStats(job_name)
+        stats[job_name].update(bool(success), execution_time, end_time)
+    
+    conn.executemany(JOB_STATS_INSERT, [job_stats.to_row() for job_stats in stats.values()])
+
+
+def _add_feature_columns(conn: sqlite3.Connection):
+    conn.execute("ALTER TABLE job_executions ADD COLUMN avg_cpu_load_5m REAL")
+    conn.execute("ALTER TABLE job_executions ADD COLUMN cpu_percent REAL")
+    conn.execute("ALTER TABLE job_executions ADD COLUMN ram_percent_used REAL")
+    conn.execute("ALTER TABLE job_executions ADD COLUMN battery_level REAL")
+    conn.execute("ALTER TABLE job_executions ADD COLUMN is_charging INTEGER")
+    conn.execute("ALTER TABLE job_executions ADD COLUMN idle_time_sec REAL")
+    
+    assignments = ", ".join(f"{column} = ?" for column in STATE_FEATURE_COLUMNS)
+    last_id = 0
+    while True:
+        rows = conn.execute('''
+            SELECT id, system_state FROM job_executions
+            WHERE id > ? AND system_state IS NOT NULL
+            ORDER BY id
+            LIMIT 1000
+        ''', (last_id,)).fetchall()
+        if not rows:
+            break
+        
+        updates = []
+        for row_id, system_state in rows:
+            try:
+                updates.append(state_features(json.loads(system_state)) + (row_id,))
+            except (ValueError, TypeError, AttributeError):
+                continue
+        
+        conn.executemany(f"UPDATE job_executions SET {assignments} WHERE id = ?", updates)
+        last_id = rows[-1][0]
+
+
+MIGRATIONS = [
+    _create_base_tables,
+    _add_execution_indexes,
+    _move_output_to_blob_store,
+    _add_job_stats,
+    _add_feature_columns
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    version = get_schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {version} is newer than supported version {SCHEMA_VERSION}"
+        )
+    
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = get_schema_version(conn)
+            if version >= SCHEMA_VERSION:
+                conn.rollback()
+                return version
+            
+            MIGRATIONS[version](conn)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
 
 class SmartCronLogger:
     
-    def __init__(self, db_path: str = "/var/lib/smartcron/logs.db", log_dir: str = "/var/log/smartcron"):
+    def __init__(self, db_path: str = "/var/lib/smartcron/logs.db", log_dir: str = "/var/log/smartcron",
+                 flush_interval: float = 1.0, max_batch: int = 1000,
+                 max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES):
         self.db_path = db_path
         self.log_dir = log_dir
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_output_bytes = max_output_bytes
         
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         os.makedirs(log_dir, exist_ok=True)
         
+        self._queue = queue.Queue()
+        self._write_lock = threading.Lock()
+        self._flush_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._flush_thread = None
+        self._readers = threading.local()
+        self._reader_conns = []
+        self._reader_lock = threading.Lock()
+        self._closed = False
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        
+        self._conn = self._connect()
         self._init_db()
         self._setup_file_logging()
+        
+        atexit.register(self.close)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._readers.conn = conn
+            with self._reader_lock:
+                self._reader_conns.append(conn)
+        return conn
     
     def _init_db(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS job_executions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_name TEXT NOT NULL,
-                start_time REAL NOT NULL,
-                end_time REAL,
-                exit_code INTEGER,
-                stdout TEXT,
-                stderr TEXT,
-                execution_time_sec REAL,
-                system_state TEXT,
-                ai_decision_reason TEXT,
-                success BOOLEAN,
-                timestamp TEXT
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS system_snapshots (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp REAL NOT NULL,
-                cpu_load REAL,
-                memory_percent REAL,
-                battery_percent REAL,
-                is_charging BOOLEAN,
-                idle_time_sec INTEGER,
-                metrics_json TEXT
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        migrate(self._conn)
     
     def _setup_file_logging(self):
         self.logger = logging.getLogger('smartcron')
@@ -76,37 +352,113 @@ class SmartCronLogger:
         self.logger.addHandler(fh)
         self.logger.addHandler(ch)
     
+    def _enqueue(self, sql: str, params: tuple):
+        if self._closed:
+            raise RuntimeError("Logger is closed")
+        
+        self._queue.put((sql, params))
+        
+        if not self.flush_interval or self.flush_interval <= 0:
+            self.flush()
+            return
+        
+        if self._queue.qsize() >= self.max_batch:
+            self._flush_event.set()
+        self._ensure_flush_thread()
+    
+    def _ensure_flush_thread(self):
+        if self._flush_thread is not None and self._flush_thread.is_alive():
+            return
+        
+        with self._write_lock:
+            if self._flush_thread is None or not self._flush_thread.is_alive():
+                self._flush_thread = threading.Thread(
+                    target=self._flush_loop, name="smartcron-log-writer", daemon=True
+                )
+                self._flush_thread.start()
+    
+    def _flush_loop(self):
+        while not self._stop_event.is_set():
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"Error writing to log database: {e}")
+    
+    def flush(self) -> int:
+        with self._write_lock:
+            batches = {}
+            count = 0
+            while True:
+                try:
+                    sql, params = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batches.setdefault(sql, []).append(params)
+                count += 1
+            
+            if not batches:
+                return 0
+            
+            with self._conn:
+                for sql, rows in batches.items():
+                    self._conn.executemany(sql, rows)
+            
+            return count
+    
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        
+        self._stop_event.set()
+        self._flush_event.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+            self._flush_thread = None
+        
+        self.flush()
+        
+        with self._reader_lock:
+            for conn in self._reader_conns:
+                conn.close()
+            self._reader_conns = []
+        self._conn.close()
+        
+        atexit.unregister(self.close)
+    
     def log_job_execution(self, job_name: str, start_time: float, end_time: float,
                           exit_code: int, stdout: str, stderr: str,
                           system_state: Dict, ai_decision_reason: Optional[str] = None):
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         execution_time = end_time - start_time
         success = exit_code == 0
         
-        cursor.execute('''
-            INSERT INTO job_executions 
-            (job_name, start_time, end_time, exit_code, stdout, stderr, 
-             execution_time_sec, system_state, ai_decision_reason, success, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        stdout_blob = encode_output(stdout, self.max_output_bytes)
+        stderr_blob = encode_output(stderr, self.max_output_bytes)
+        for blob in (stdout_blob, stderr_blob):
+            if blob:
+                self._enqueue(JOB_OUTPUT_INSERT, blob)
+        
+        self._enqueue(JOB_EXECUTION_INSERT, (
             job_name,
             start_time,
             end_time,
             exit_code,
-            stdout,
-            stderr,
+            stdout_blob[0] if stdout_blob else None,
+            stderr_blob[0] if stderr_blob else None,
             execution_time,
             json.dumps(system_state),
             ai_decision_reason,
             success,
             datetime.now().isoformat()
-        ))
+        ) + state_features(system_state))
         
-        conn.commit()
-        conn.close()
+        with self._stats_lock:
+            stats = self._load_job_stats(job_name)
+            stats.update(success, execution_time, end_time)
+            self._enqueue(JOB_STATS_INSERT, stats.to_row())
         
         status = "SUCCESS" if success else "FAILED"
         self.logger.info(f"Job '{job_name}' {status} (exit_code={exit_code}, duration={execution_time:.2f}s)")
@@ -126,14 +478,7 @@ class SmartCronLogger:
             f.write(f"{'='*80}\n")
     
     def log_system_snapshot(self, metrics: Dict):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO system_snapshots 
-            (timestamp, cpu_load, memory_percent, battery_percent, is_charging, idle_time_sec, metrics_json)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        self._enqueue(SYSTEM_SNAPSHOT_INSERT, (
             metrics.get("timestamp", 0),
             metrics.get("cpu", {}).get("cpu_percent", 0),
             metrics.get("memory", {}).get("percent", 0),
@@ -142,42 +487,61 @@ class SmartCronLogger:
             metrics.get("idle_time_sec"),
             json.dumps(metrics)
         ))
-        
-        conn.commit()
-        conn.close()
     
-    def get_job_history(self, job_name: str, limit: int = 100) -> List[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def get_job_history(self, job_name: str, limit: int = 100, include_output: bool = True) -> List[Dict]:
+        self.flush()
         
-        cursor.execute('''
-            SELECT * FROM job_executions 
+        cursor = self._reader().execute(f'''
+            SELECT {JOB_HISTORY_COLUMNS} FROM job_executions 
             WHERE job_name = ?
             ORDER BY start_time DESC
             LIMIT ?
         ''', (job_name, limit))
         
-        rows = cursor.fetchall()
-        conn.close()
+        history = []
+        for row in cursor.fetchall():
+            entry = dict(row)
+            entry["stdout"] = self.get_output(entry["stdout_hash"]) if include_output else None
+            entry["stderr"] = self.get_output(entry["stderr_hash"]) if include_output else None
+            history.append(entry)
         
-        return [dict(row) for row in rows]
+        return history
     
-    def get_job_success_rate(self, job_name: str, last_n: int = 10) -> float:
-        history = self.get_job_history(job_name, limit=last_n)
-        if not history:
-            return 1.0
+    def get_output(self, output_hash: Optional[str]) -> Optional[str]:
+        if output_hash is None:
+            return None
         
-        successes = sum(1 for h in history if h['success'])
-        return successes / len(history)
+        row = self._reader().execute(
+            "SELECT data FROM job_outputs WHERE hash = ?", (output_hash,)
+        ).fetchone()
+        return decode_output(row["data"]) if row else None
+    
+    def _load_job_stats(self, job_name: str) -> JobStats:
+        stats = self._stats.get(job_name)
+        if stats is None:
+            row = self._reader().execute(
+                f"SELECT {', '.join(JOB_STATS_FIELDS)} FROM job_stats WHERE job_name = ?", (job_name,)
+            ).fetchone()
+            stats = JobStats.from_row(tuple(row)) if row else JobStats(job_name)
+            self._stats[job_name] = stats
+        return stats
+    
+    def get_job_stats(self, job_name: str) -> Optional[Dict[str, any]]:
+        with self._stats_lock:
+            stats = self._load_job_stats(job_name)
+            return stats.to_dict() if stats.total_runs else None
+    
+    def get_job_success_rate(self, job_name: str, last_n: int = 10) -> float:
+        with self._stats_lock:
+            rate = self._load_job_stats(job_name).recent_success_rate(last_n)
+        return rate if rate is not None else 1.0
     
     def get_average_execution_time(self, job_name: str, last_n: int = 10) -> float:
-        history = self.get_job_history(job_name, limit=last_n)
-        if not history:
-            return 0.0
-        
-        times = [h['execution_time_sec'] for h in history if h['execution_time_sec']]
-        return sum(times) / len(times) if times else 0.0
+        with self._stats_lock:
+            stats = self._load_job_stats(job_name)
+            if stats.runtime_ewma is not None:
+                return stats.runtime_ewma
+            return stats.runtime_total / stats.runtime_count if stats.runtime_count else 0.0
     
     def info(self, message: str):
         self.logger.info(message)
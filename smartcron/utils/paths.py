@@ -0,0 +1,8 @@
+import re
+
+
+def safe_filename(name: str) -> str:
+    safe = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+    if not safe.strip('.'):
+        safe = '_' * max(len(safe), 1)
+    return safe
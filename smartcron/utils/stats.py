@@ -0,0 +1,225 @@
+import json
+import math
+import numpy as np
+from typing import Dict, List, Optional
+
+
+RECENT_OUTCOMES = 32
+EWMA_ALPHA = 0.2
+SKETCH_GAMMA = 1.05
+MIN_RUNTIME_SEC = 0.001
+
+JOB_STATS_FIELDS = (
+    "job_name",
+    "total_runs",
+    "success_count",
+    "failure_count",
+    "success_streak",
+    "failure_streak",
+    "last_run_time",
+    "last_success_time",
+    "last_failure_time",
+    "runtime_count",
+    "runtime_total",
+    "runtime_max",
+    "runtime_ewma",
+    "runtime_sketch",
+    "recent_outcomes",
+    "recent_count"
+)
+
+
+class RuntimeSketch:
+    
+    def __init__(self, buckets: Optional[Dict[int, int]] = None):
+        self.buckets = buckets or {}
+        self.count = sum(self.buckets.values())
+    
+    @staticmethod
+    def _index(value: float) -> int:
+        return math.ceil(math.log(max(value, MIN_RUNTIME_SEC), SKETCH_GAMMA))
+    
+    def add(self, value: float):
+        index = self._index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+    
+    def add_many(self, values: np.ndarray):
+        clipped = np.maximum(np.asarray(values, dtype=np.float64), MIN_RUNTIME_SEC)
+        indices, counts = np.unique(np.ceil(np.log(clipped) / math.log(SKETCH_GAMMA)), return_counts=True)
+        for index, count in zip(indices.astype(int).tolist(), counts.tolist()):
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += int(counts.sum())
+    
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return 2 * SKETCH_GAMMA ** index / (SKETCH_GAMMA + 1)
+        
+        return 2 * SKETCH_GAMMA ** max(self.buckets) / (SKETCH_GAMMA + 1)
+    
+    def to_json(self) -> str:
+        return json.dumps({str(index): count for index, count in self.buckets.items()})
+    
+    @classmethod
+    def from_json(cls, data: Optional[str]) -> "RuntimeSketch":
+        if not data:
+            return cls()
+        return cls({int(index): count for index, count in json.loads(data).items()})
+
+
+class JobStats:
+    
+    def __init__(self, job_name: str):
+        self.job_name = job_name
+        self.total_runs = 0
+        self.success_count = 0
+        self.failure_count = 0
+        self.success_streak = 0
+        self.failure_streak = 0
+        self.last_run_time = None
+        self.last_success_time = None
+        self.last_failure_time = None
+        self.runtime_count = 0
+        self.runtime_total = 0.0
+        self.runtime_max = None
+        self.runtime_ewma = None
+        self.runtime_sketch = RuntimeSketch()
+        self.recent_outcomes = 0
+        self.recent_count = 0
+    
+    def update(self, success: bool, execution_time: Optional[float], end_time: float):
+        self.total_runs += 1
+        self.last_run_time = end_time
+        
+        if success:
+            self.success_count += 1
+            self.success_streak += 1
+            self.failure_streak = 0
+            self.last_success_time = end_time
+        else:
+            self.failure_count += 1
+            self.failure_streak += 1
+            self.success_streak = 0
+            self.last_failure_time = end_time
+        
+        self.recent_outcomes = ((self.recent_outcomes << 1) | int(success)) & ((1 << RECENT_OUTCOMES) - 1)
+        self.recent_count = min(self.recent_count + 1, RECENT_OUTCOMES)
+        
+        if execution_time is not None:
+            self.runtime_count += 1
+            self.runtime_total += execution_time
+            self.runtime_max = execution_time if self.runtime_max is None else max(self.runtime_max, execution_time)
+            if self.runtime_ewma is None:
+                self.runtime_ewma = execution_time
+            else:
+                self.runtime_ewma += EWMA_ALPHA * (execution_time - self.runtime_ewma)
+            self.runtime_sketch.add(execution_time)
+    
+    def update_many(self, successes: np.ndarray, execution_times: np.ndarray, end_times: np.ndarray):
+        successes = np.asarray(successes, dtype=bool)
+        execution_times = np.asarray(execution_times, dtype=np.float64)
+        end_times = np.asarray(end_times, dtype=np.float64)
+        count = len(successes)
+        if not count:
+            return
+        
+        succeeded = int(successes.sum())
+        self.total_runs += count
+        self.success_count += succeeded
+        self.failure_count += count - succeeded
+        self.last_run_time = float(end_times[-1])
+        
+        if succeeded:
+            self.last_success_time = float(end_times[successes][-1])
+        if succeeded < count:
+            self.last_failure_time = float(end_times[~successes][-1])
+        
+        final = bool(successes[-1])
+        changes = np.flatnonzero(successes != final)
+        streak = count - 1 - int(changes[-1]) if len(changes) else count
+        if final:
+            self.success_streak = streak if len(changes) else self.success_streak + streak
+            self.failure_streak = 0
+        else:
+            self.failure_streak = streak if len(changes) else self.failure_streak + streak
+            self.success_streak = 0
+        
+        for success in successes[-RECENT_OUTCOMES:].tolist():
+            self.recent_outcomes = ((self.recent_outcomes << 1) | int(success)) & ((1 << RECENT_OUTCOMES) - 1)
+        self.recent_count = min(self.recent_count + count, RECENT_OUTCOMES)
+        
+        runtimes = execution_times[~np.isnan(execution_times)]
+        if not len(runtimes):
+            return
+        
+        self.runtime_count += len(runtimes)
+        self.runtime_total += float(runtimes.sum())
+        batch_max = float(runtimes.max())
+        self.runtime_max = batch_max if self.runtime_max is None else max(self.runtime_max, batch_max)
+        self.runtime_sketch.add_many(runtimes)
+        
+        if self.runtime_ewma is None:
+            self.runtime_ewma = float(runtimes[0])
+            runtimes = runtimes[1:]
+        decay = (1 - EWMA_ALPHA) ** np.arange(len(runtimes) - 1, -1, -1)
+        self.runtime_ewma = float(
+            self.runtime_ewma * (1 - EWMA_ALPHA) ** len(runtimes) + EWMA_ALPHA * np.dot(decay, runtimes)
+        )
+    
+    def recent(self) -> List[bool]:
+        return [bool(self.recent_outcomes >> i & 1) for i in range(self.recent_count)]
+    
+    def recent_success_rate(self, last_n: Optional[int] = None) -> Optional[float]:
+        count = self.recent_count if last_n is None else min(last_n, self.recent_count)
+        if count <= 0:
+            return None
+        return bin(self.recent_outcomes & ((1 << count) - 1)).count("1") / count
+    
+    def to_row(self) -> tuple:
+        return tuple(
+            self.runtime_sketch.to_json() if field == "runtime_sketch" else getattr(self, field)
+            for field in JOB_STATS_FIELDS
+        )
+    
+    @classmethod
+    def from_row(cls, row) -> "JobStats":
+        stats = cls(row[0])
+        for field, value in zip(JOB_STATS_FIELDS[1:], row[1:]):
+            setattr(stats, field, value)
+        stats.runtime_sketch = RuntimeSketch.from_json(row[JOB_STATS_FIELDS.index("runtime_sketch")])
+        return stats
+    
+    def runtime_quantile(self, q: float) -> Optional[float]:
+        estimate = self.runtime_sketch.quantile(q)
+        if estimate is None or self.runtime_max is None:
+            return estimate
+        return min(estimate, self.runtime_max)
+    
+    def to_dict(self) -> Dict[str, any]:
+        return {
+            "job_name": self.job_name,
+            "total_runs": self.total_runs,
+            "success_count": self.success_count,
+            "failure_count": self.failure_count,
+            "success_rate": self.success_count / self.total_runs if self.total_runs else None,
+            "recent_success_rate": self.recent_success_rate(),
+            "recent_outcomes": self.recent(),
+            "success_streak": self.success_streak,
+            "failure_streak": self.failure_streak,
+            "last_run_time": self.last_run_time,
+            "last_success_time": self.last_success_time,
+            "last_failure_time": self.last_failure_time,
+            "avg_runtime": self.runtime_total / self.runtime_count if self.runtime_count else None,
+            "ewma_runtime": self.runtime_ewma,
+            "max_runtime": self.runtime_max,
+            "p50_runtime": self.runtime_sketch.quantile(0.5),
+            "p95_runtime": self.runtime_quantile(0.95),
+            "p99_runtime": self.runtime_quantile(0.99)
+        }
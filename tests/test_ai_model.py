@@ -0,0 +1,446 @@
+import unittest
+import tempfile
+import shutil
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import json
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from smartcron.ai.cache import PredictionCache
+from smartcron.ai.compiled import CompiledForest
+from smartcron.ai.model import AIPredictor
+from smartcron.ai.registry import ModelRegistry, job_model_path
+from smartcron.ai.train_model import ModelTrainer
+from smartcron.utils.stats import JobStats
+
+
+def train_forest(n_samples=500, random_state=0):
+    rng = np.random.default_rng(random_state)
+    X = rng.uniform(0, 100, (n_samples, 8))
+    y = (X[:, 1] + rng.normal(0, 15, n_samples) < 60).astype(int)
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=random_state)
+    return model.fit(X, y), rng
+
+
+class TestCompiledForest(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_matches_sklearn_predict_proba(self):
+        model, rng = train_forest()
+        X = rng.uniform(0, 100, (200, 8))
+        
+        compiled = CompiledForest.from_sklearn(model)
+        
+        np.testing.assert_array_equal(compiled.predict_proba(X), model.predict_proba(X))
+        np.testing.assert_array_equal(compiled.classes_, model.classes_)
+    
+    def test_save_and_load(self):
+        model, rng = train_forest()
+        X = rng.uniform(0, 100, (50, 8))
+        path = os.path.join(self.temp_dir, "model.npz")
+        
+        CompiledForest.from_sklearn(model).save(path)
+        loaded = CompiledForest.load(path)
+        
+        np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+    
+    def test_rejects_wrong_feature_count(self):
+        model, _ = train_forest()
+        
+        with self.assertRaises(ValueError):
+            CompiledForest.from_sklearn(model).predict_proba(np.zeros((1, 3)))
+    
+    def test_predictor_loads_compiled_model(self):
+        model, _ = train_forest()
+        trainer = ModelTrainer(db_path=os.path.join(self.temp_dir, "logs.db"))
+        trainer.model = model
+        trainer.export_compiled(os.path.join(self.temp_dir, "model.npz"))
+        
+        predictor = AIPredictor(model_path=os.path.join(self.temp_dir, "model.pkl"))
+        metrics = {"cpu": {"cpu_percent": 10, "load_5m": 0.5}, "memory": {"percent": 40}}
+        probability, reason = predictor.predict(metrics, {})
+        
+        features = predictor.prepare_features(metrics, {})
+        self.assertIsInstance(predictor.model, CompiledForest)
+        self.assertEqual(probability, model.predict_proba(features)[0][1])
+        self.assertIn("AI model predicts", reason)
+
+
+class TestPredictionCache(unittest.TestCase):
+    
+    def setUp(self):
+        self.columns = ['cpu_percent', 'last_job_success', 'time_of_day']
+    
+    def test_nearby_features_share_key(self):
+        cache = PredictionCache(self.columns, tolerances={'cpu_percent': 10})
+        
+        self.assertEqual(cache.key([21, 1, 14]), cache.key([29, 1, 14]))
+        self.assertNotEqual(cache.key([21, 1, 14]), cache.key([31, 1, 14]))
+        self.assertNotEqual(cache.key([21, 1, 14]), cache.key([21, 0, 14]))
+    
+    def test_growing_idle_time_reuses_buckets(self):
+        cache = PredictionCache(['cpu_percent', 'idle_time_sec'])
+        
+        for tick in range(50):
+            key = cache.key([20, 120 + 60 * tick])
+            if cache.get(key, now=tick) is None:
+                cache.put(key, 0.9, now=tick)
+        
+        self.assertEqual(cache.key([20, 30]), cache.key([20, 59]))
+        self.assertEqual(cache.key([20, 1800]), cache.key([20, 86400]))
+        self.assertEqual(cache.stats()["misses"], 3)
+        self.assertEqual(cache.stats()["hits"], 47)
+    
+    def test_ttl_and_counters(self):
+        cache = PredictionCache(self.columns, ttl_sec=60)
+        key = cache.key([20, 1, 9])
+        
+        self.assertIsNone(cache.get(key, now=0))
+        cache.put(key, 0.8, now=0)
+        self.assertEqual(cache.get(key, now=30), 0.8)
+        self.assertIsNone(cache.get(key, now=61))
+        
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+        self.assertEqual(len(cache), 0)
+    
+    def test_evicts_least_recently_used(self):
+        cache = PredictionCache(self.columns, max_entries=2)
+        first, second, third = cache.key([0, 1, 0]), cache.key([0, 1, 1]), cache.key([0, 1, 2])
+        
+        cache.put(first, 0.1, now=0)
+        cache.put(second, 0.2, now=0)
+        cache.get(first, now=0)
+        cache.put(third, 0.3, now=0)
+        
+        self.assertEqual(cache.get(first, now=0), 0.1)
+        self.assertIsNone(cache.get(second, now=0))
+    
+    def test_predictor_skips_model_on_cache_hit(self):
+        model, _ = train_forest()
+        predictor = AIPredictor(model_path="/nonexistent/model.pkl")
+        predictor.model = model
+        calls = []
+        original = model.predict_proba
+        model.predict_proba = lambda X: calls.append(len(X)) or original(X)
+        
+        metrics = {"cpu": {"cpu_percent": 21, "load_5m": 0.5}, "memory": {"percent": 40}}
+        jobs = [{"last_job_success": i % 2} for i in range(6)]
+        first = predictor.predict_batch(metrics, jobs)
+        
+        metrics["cpu"]["cpu_percent"] = 22
+        second = predictor.predict_batch(metrics, jobs)
+        
+        self.assertEqual(calls, [2])
+        self.assertEqual([p for p, _ in first], [p for p, _ in second])
+        self.assertEqual(predictor.cache_stats()["hits"], 6)
+
+
+class TestPrepareFeatures(unittest.TestCase):
+    
+    def setUp(self):
+        self.trainer = ModelTrainer(db_path=":memory:")
+        states = [
+            {"cpu": {"load_5m": 1.5, "cpu_percent": 30}, "memory": {"percent": 50},
+             "battery": {"percent": 40, "is_charging": False}, "idle_time_sec": 120},
+            {"cpu": {"load_5m": 0.5, "cpu_percent": 10}, "memory": {"percent": 20}},
+            {"cpu": {"load_5m": 2.0, "cpu_percent": 90}, "memory": {"percent": 80}, "battery": None},
+            {"cpu": {"load_5m": 0.1, "cpu_percent": 5}, "memory": {"percent": 30}}
+        ]
+        self.df = pd.DataFrame({
+            "job_name": ["a", "b", "a", "a"],
+            "start_time": [7200.0, 0.0, 3600.0, 10800.0],
+            "success": [0, 1, 1, 1],
+            "system_state": [json.dumps(state) for state in states]
+        })
+    
+    def test_parses_json_in_bulk(self):
+        features = self.trainer.prepare_features(self.df)
+        
+        self.assertEqual(list(features.columns), self.trainer.feature_columns + ["success"])
+        self.assertEqual(features.loc[0, "battery_level"], 40)
+        self.assertEqual(features.loc[0, "is_charging"], 0)
+        self.assertEqual(features.loc[1, "battery_level"], 100)
+        self.assertEqual(list(features["time_of_day"]), [2, 0, 1, 3])
+    
+    def test_last_job_success_comes_from_previous_run(self):
+        features = self.trainer.prepare_features(self.df)
+        
+        self.assertEqual(list(features["last_job_success"]), [1, 1, 1, 0])
+    
+    def test_stored_columns_match_json(self):
+        parsed = self.trainer.prepare_features(self.df)
+        columns = self.trainer._state_feature_frame(self.df)
+        stored = pd.concat([self.df.drop(columns="system_state"), columns], axis=1)
+        
+        pd.testing.assert_frame_equal(self.trainer.prepare_features(stored), parsed)
+    
+    def test_skips_invalid_state(self):
+        self.df.loc[1, "system_state"] = "not json"
+        
+        self.assertEqual(len(self.trainer.prepare_features(self.df)), 3)
+
+
+class TestTrainingDataLoader(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "logs.db")
+        self.trainer = ModelTrainer(db_path=self.db_path)
+        
+        self.trainer.generate_synthetic_data(n_samples=100, seed=2)
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE job_executions SET job_name = 'other_job' WHERE id % 3 = 0")
+        conn.commit()
+        conn.close()
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_chunks_match_single_pass(self):
+        expected = self.trainer.prepare_features(self.trainer.load_training_data())
+        features, last_id = self.trainer.load_training_features(chunk_size=7)
+        
+        pd.testing.assert_frame_equal(features, expected)
+        self.assertEqual(last_id, 100)
+    
+    def test_filters_by_job_and_time(self):
+        df = self.trainer.load_training_data()
+        start, end = df["start_time"].iloc[10], df["start_time"].iloc[40]
+        
+        filtered = self.trainer.load_training_data(start_time=start, end_time=end, job_names=["other_job"],
+                                                   chunk_size=3)
+        
+        self.assertEqual(set(filtered["job_name"]), {"other_job"})
+        self.assertEqual(len(filtered), 10)
+        self.assertTrue(((filtered["start_time"] >= start) & (filtered["start_time"] < end)).all())
+        pd.testing.assert_frame_equal(df, self.trainer.load_training_data(chunk_size=7))
+    
+    def test_reservoir_bounds_memory(self):
+        everything, _ = self.trainer.load_training_features()
+        sampled, last_id = self.trainer.load_training_features(chunk_size=16, max_samples=25)
+        
+        self.assertEqual(len(sampled), 25)
+        self.assertEqual(last_id, 100)
+        merged = sampled.merge(everything.drop_duplicates(), how="left", indicator=True)
+        self.assertTrue((merged["_merge"] == "both").all())
+    
+    def test_sample_fraction(self):
+        sampled, _ = self.trainer.load_training_features(chunk_size=16, sample_fraction=0.5)
+        
+        self.assertGreater(len(sampled), 20)
+        self.assertLess(len(sampled), 80)
+
+
+class TestSyntheticData(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "logs.db")
+        self.job_mix = {
+            "backup": {"weight": 1, "runtime_sec": 1800, "runtime_sigma": 0.5, "base_success": 0.6},
+            "cleanup": {"weight": 3, "runtime_sec": 2}
+        }
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def _generate(self, db_path, seed=3):
+        ModelTrainer(db_path=db_path).generate_synthetic_data(
+            n_samples=2000, job_mix=self.job_mix, seed=seed, interval_sec=60, chunk_size=300
+        )
+        return sqlite3.connect(db_path)
+    
+    def test_follows_job_mix(self):
+        conn = self._generate(self.db_path)
+        counts = dict(conn.execute("SELECT job_name, COUNT(*) FROM job_executions GROUP BY job_name"))
+        runtimes = dict(conn.execute("SELECT job_name, AVG(execution_time_sec) FROM job_executions GROUP BY job_name"))
+        conn.close()
+        
+        self.assertEqual(sum(counts.values()), 2000)
+        self.assertAlmostEqual(counts["cleanup"] / 2000, 0.75, delta=0.05)
+        self.assertAlmostEqual(runtimes["cleanup"], 2.0)
+        self.assertAlmostEqual(runtimes["backup"], 1800, delta=150)
+    
+    def test_seed_is_reproducible(self):
+        query = "SELECT job_name, success, execution_time_sec, cpu_percent, idle_time_sec FROM job_executions ORDER BY id"
+        first = self._generate(self.db_path).execute(query).fetchall()
+        second = self._generate(os.path.join(self.temp_dir, "other.db")).execute(query).fetchall()
+        
+        self.assertEqual(first, second)
+    
+    def test_start_times_fit_window(self):
+        before = time.time()
+        ModelTrainer(db_path=self.db_path).generate_synthetic_data(n_samples=2000, seed=1, window_days=1)
+        conn = sqlite3.connect(self.db_path)
+        start_times = [row[0] for row in conn.execute("SELECT start_time FROM job_executions ORDER BY id")]
+        conn.close()
+        
+        self.assertGreaterEqual(start_times[0], before - 86400 - 1)
+        self.assertLessEqual(start_times[-1], time.time())
+        self.assertAlmostEqual(start_times[1] - start_times[0], 86400 / 2000, places=2)
+    
+    def test_maintains_stats_and_outputs(self):
+        conn = self._generate(self.db_path)
+        missing = conn.execute(
+            "SELECT COUNT(*) FROM job_executions je LEFT JOIN job_outputs jo "
+            "ON jo.hash = COALESCE(je.stdout_hash, je.stderr_hash) WHERE jo.hash IS NULL"
+        ).fetchone()[0]
+        rows = conn.execute(
+            "SELECT job_name, success, execution_time_sec, end_time FROM job_executions ORDER BY id"
+        ).fetchall()
+        stored = conn.execute("SELECT * FROM job_stats WHERE job_name = 'backup'").fetchone()
+        conn.close()
+        
+        expected = JobStats("backup")
+        for job_name, success, execution_time, end_time in rows:
+            if job_name == "backup":
+                expected.update(bool(success), execution_time, end_time)
+        actual = JobStats.from_row(stored).to_dict()
+        
+        self.assertEqual(missing, 0)
+        for key, value in expected.to_dict().items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(actual[key], value, places=6)
+            else:
+                self.assertEqual(actual[key], value)
+
+
+class TestIncrementalTraining(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "logs.db")
+        self.model_path = os.path.join(self.temp_dir, "models", "model.pkl")
+        self.trainer = ModelTrainer(db_path=self.db_path)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_adds_trees_for_new_rows_only(self):
+        self.trainer.generate_synthetic_data(n_samples=200, seed=0)
+        self.trainer.train()
+        self.trainer.save_model(self.model_path)
+        
+        self.assertEqual(self.trainer.load_state(self.model_path)["watermark"], 200)
+        self.assertIsNone(ModelTrainer(db_path=self.db_path).train_incremental(self.model_path))
+        
+        self.trainer.generate_synthetic_data(n_samples=50, seed=10)
+        trainer = ModelTrainer(db_path=self.db_path)
+        model = trainer.train_incremental(self.model_path, trees_per_update=5, max_trees=102)
+        trainer.save_model(self.model_path)
+        
+        self.assertEqual(len(model.estimators_), 102)
+        self.assertEqual(trainer.load_state(self.model_path)["watermark"], 250)
+    
+    def test_predictor_hot_swaps_changed_model(self):
+        self.trainer.generate_synthetic_data(n_samples=200, seed=1)
+        self.trainer.train()
+        self.trainer.save_model(self.model_path)
+        
+        predictor = AIPredictor(model_path=self.model_path)
+        self.assertEqual(predictor.model.n_trees, 100)
+        self.assertFalse(predictor.reload_if_changed())
+        
+        self.trainer.generate_synthetic_data(n_samples=50, seed=10)
+        trainer = ModelTrainer(db_path=self.db_path)
+        trainer.train_incremental(self.model_path, trees_per_update=5)
+        trainer.save_model(self.model_path)
+        compiled_path = os.path.join(self.temp_dir, "models", "model.npz")
+        os.utime(compiled_path, (os.path.getmtime(compiled_path) + 1,) * 2)
+        
+        self.assertTrue(predictor.reload_if_changed())
+        self.assertEqual(predictor.model.n_trees, 105)
+        self.assertEqual(len(predictor.cache), 0)
+
+
+class TestModelRegistry(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.job_dir = os.path.join(self.temp_dir, "jobs")
+        os.makedirs(self.job_dir)
+        self.metrics = {"cpu": {"cpu_percent": 50, "load_5m": 0.5}, "memory": {"percent": 40}}
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def _save_job_model(self, job_name, random_state=0):
+        model, _ = train_forest(random_state=random_state)
+        CompiledForest.from_sklearn(model).save(job_model_path(self.job_dir, job_name, ".npz"))
+        return model
+    
+    def test_loads_lazily_and_bounds_memory(self):
+        for job_name in ("a", "b", "c"):
+            self._save_job_model(job_name)
+        registry = ModelRegistry(self.job_dir, max_loaded=2)
+        
+        self.assertEqual(registry.loads, 0)
+        for job_name in ("a", "b", "c", "c"):
+            self.assertIsInstance(registry.get(job_name), CompiledForest)
+        self.assertIsNone(registry.get("unknown"))
+        
+        self.assertEqual(registry.stats(), {"loaded": ["b", "c"], "loads": 3, "evictions": 1})
+    
+    def test_reloads_changed_models(self):
+        self._save_job_model("a")
+        registry = ModelRegistry(self.job_dir)
+        first = registry.get("a")
+        self.assertIsNone(registry.get("b"))
+        
+        self._save_job_model("b")
+        path = job_model_path(self.job_dir, "a", ".npz")
+        os.utime(path, (os.path.getmtime(path) + 1,) * 2)
+        
+        self.assertTrue(registry.reload_if_changed())
+        self.assertIsNot(registry.get("a"), first)
+        self.assertIsNotNone(registry.get("b"))
+    
+    def test_predictor_scores_with_job_models(self):
+        global_model, _ = train_forest(random_state=0)
+        job_model = self._save_job_model("backup", random_state=5)
+        predictor = AIPredictor(model_path=os.path.join(self.temp_dir, "model.pkl"))
+        predictor.model = global_model
+        
+        jobs = [{"job_name": "backup"}, {"job_name": "cleanup"}, {}]
+        predictions = predictor.predict_batch(self.metrics, jobs)
+        features = predictor.prepare_features(self.metrics, {})
+        
+        self.assertEqual(predictions[0][0], job_model.predict_proba(features)[0][1])
+        self.assertIn("per-job model", predictions[0][1])
+        for probability, reason in predictions[1:]:
+            self.assertEqual(probability, global_model.predict_proba(features)[0][1])
+            self.assertNotIn("per-job model", reason)
+        self.assertEqual(predictor.job_model_stats()["loaded"], ["backup"])
+    
+    def test_train_per_job(self):
+        db_path = os.path.join(self.temp_dir, "logs.db")
+        trainer = ModelTrainer(db_path=db_path)
+        trainer.generate_synthetic_data(
+            n_samples=300, seed=4, job_mix={"backup": {"weight": 2}, "cleanup": {"weight": 1}, "rare": {"weight": 0.02}}
+        )
+        
+        trained = trainer.train_per_job(self.job_dir, min_samples=50)
+        
+        self.assertEqual(trained, ["backup", "cleanup"])
+        for job_name in trained:
+            self.assertTrue(os.path.exists(job_model_path(self.job_dir, job_name, ".npz")))
+            self.assertFalse(os.path.exists(trainer.state_path(job_model_path(self.job_dir, job_name))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 import tempfile
+from datetime import datetime
 import os
 import sys
 from pathlib import Path
@@ -53,6 +54,147 @@ class TestJobConfig(unittest.TestCase):
         result = job.is_in_schedule_window()
         
         self.assertTrue(result)
+    
+    def test_next_eligible_time_window(self):
+        config_dict = {
+            "job_name": "test_job",
+            "command": "echo 'test'",
+            "schedule_window_start": "22:00",
+            "schedule_window_end": "06:00"
+        }
+        
+        job = JobConfig(config_dict)
+        noon = datetime(2024, 5, 1, 12, 0).timestamp()
+        night = datetime(2024, 5, 1, 23, 30).timestamp()
+        
+        self.assertEqual(job.next_eligible_time(noon), datetime(2024, 5, 1, 22, 0).timestamp())
+        self.assertEqual(job.next_eligible_time(night), night)
+    
+    def test_next_eligible_time_preferred(self):
+        config_dict = {
+            "job_name": "test_job",
+            "command": "echo 'test'",
+            "preferred_time": ["03:00"]
+        }
+        
+        job = JobConfig(config_dict)
+        noon = datetime(2024, 5, 1, 12, 0).timestamp()
+        
+        self.assertEqual(job.next_eligible_time(noon), datetime(2024, 5, 2, 2, 0).timestamp())
+        
+        job.ai_aware = True
+        self.assertEqual(job.next_eligible_time(noon), noon)
+        
+        job.enabled = False
+        self.assertIsNone(job.next_eligible_time(noon))
+    
+    def test_compiled_window_wraps_midnight(self):
+        config_dict = {
+            "job_name": "test_job",
+            "command": "echo 'test'",
+            "schedule_window_start": "22:00",
+            "schedule_window_end": "06:00"
+        }
+        
+        job = JobConfig(config_dict)
+        
+        self.assertEqual(job._window_intervals, [(0, 361), (1320, 1440)])
+        self.assertTrue(job.is_in_schedule_window(datetime(2024, 5, 1, 23, 15)))
+        self.assertTrue(job.is_in_schedule_window(datetime(2024, 5, 1, 6, 0)))
+        self.assertFalse(job.is_in_schedule_window(datetime(2024, 5, 1, 6, 1)))
+        self.assertFalse(job.is_in_schedule_window(datetime(2024, 5, 1, 12, 0)))
+    
+    def test_next_eligible_time_window_and_preferred(self):
+        config_dict = {
+            "job_name": "test_job",
+            "command": "echo 'test'",
+            "preferred_time": ["01:00", "02:00", "bogus"],
+            "schedule_window_start": "01:30",
+            "schedule_window_end": "05:00"
+        }
+        
+        job = JobConfig(config_dict)
+        
+        self.assertEqual(job._preferred_intervals, [(0, 240)])
+        self.assertEqual(
+            job.next_eligible_time(datetime(2024, 5, 1, 0, 10).timestamp()),
+            datetime(2024, 5, 1, 1, 30).timestamp()
+        )
+        self.assertEqual(
+            job.next_eligible_time(datetime(2024, 5, 1, 4, 30).timestamp()),
+            datetime(2024, 5, 2, 1, 30).timestamp()
+        )
+    
+    def test_retry_delay_backoff(self):
+        config_dict = {
+            "job_name": "test_job",
+            "command": "echo 'test'",
+            "retry_delay_sec": 10,
+            "retry_backoff": 3,
+            "retry_max_delay_sec": 100,
+            "retry_jitter": 0
+        }
+        
+        job = JobConfig(config_dict)
+        
+        self.assertEqual(job.get_retry_delay(1), 10)
+        self.assertEqual(job.get_retry_delay(2), 30)
+        self.assertEqual(job.get_retry_delay(3), 90)
+        self.assertEqual(job.get_retry_delay(4), 100)
+    
+    def test_retry_delay_jitter(self):
+        config_dict = {
+            "job_name": "test_job",
+            "command": "echo 'test'",
+            "retry_delay_sec": 100,
+            "retry_jitter": 0.2
+        }
+        
+        job = JobConfig(config_dict)
+        delays = [job.get_retry_delay(1) for _ in range(50)]
+        
+        self.assertTrue(all(80 <= delay <= 120 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+    
+    def test_cron_schedule_due_and_advance(self):
+        config_dict = {
+            "job_name": "test_job",
+            "command": "echo 'test'",
+            "schedule": "*/15 * * * *"
+        }
+        
+        job = JobConfig(config_dict)
+        now = datetime(2024, 1, 31, 12, 34, 56).timestamp()
+        job.next_fire_time = datetime(2024, 1, 31, 12, 45).timestamp()
+        
+        self.assertFalse(job.is_due(now))
+        self.assertEqual(job.next_eligible_time(now), job.next_fire_time)
+        
+        later = datetime(2024, 1, 31, 12, 50).timestamp()
+        self.assertTrue(job.is_due(later))
+        self.assertEqual(job.next_eligible_time(later), later)
+        
+        job.advance_schedule(later)
+        self.assertEqual(job.next_fire_time, datetime(2024, 1, 31, 13, 0).timestamp())
+    
+    def test_cron_schedule_respects_window(self):
+        config_dict = {
+            "job_name": "test_job",
+            "command": "echo 'test'",
+            "schedule": "@hourly",
+            "schedule_window_start": "02:00",
+            "schedule_window_end": "04:00"
+        }
+        
+        job = JobConfig(config_dict)
+        job.next_fire_time = datetime(2024, 1, 31, 12, 0).timestamp()
+        now = datetime(2024, 1, 31, 12, 0, 5).timestamp()
+        
+        self.assertEqual(job.next_eligible_time(now), datetime(2024, 2, 1, 2, 0).timestamp())
+    
+    def test_invalid_cron_schedule(self):
+        with self.assertRaises(ValueError):
+            JobConfig({"job_name": "test_job", "command": "echo 'test'", "schedule": "61 * * * *"})
 
 
 class TestJobConfigParser(unittest.TestCase):
@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime, timezone
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from smartcron.config.cron import CronExpression
+
+
+def fire_times(expression, start, count, tz=None):
+    cron = CronExpression(expression, tz)
+    return [datetime.fromtimestamp(t) for t in cron.next_fire_times(start.timestamp(), count)]
+
+
+class TestCronExpression(unittest.TestCase):
+    
+    def test_step_minutes(self):
+        times = fire_times("*/15 * * * *", datetime(2024, 1, 31, 12, 34, 56), 3)
+        
+        self.assertEqual(times, [
+            datetime(2024, 1, 31, 12, 45),
+            datetime(2024, 1, 31, 13, 0),
+            datetime(2024, 1, 31, 13, 15)
+        ])
+    
+    def test_next_fire_is_strictly_after(self):
+        cron = CronExpression("0 * * * *")
+        start = datetime(2024, 1, 31, 12, 0).timestamp()
+        
+        self.assertEqual(cron.next_fire_after(start), datetime(2024, 1, 31, 13, 0).timestamp())
+    
+    def test_aliases(self):
+        start = datetime(2024, 1, 31, 12, 0)
+        
+        self.assertEqual(fire_times("@daily", start, 1), [datetime(2024, 2, 1)])
+        self.assertEqual(fire_times("@weekly", start, 1), [datetime(2024, 2, 4)])
+        self.assertEqual(fire_times("@monthly", start, 1), [datetime(2024, 2, 1)])
+        self.assertEqual(fire_times("@yearly", start, 1), [datetime(2025, 1, 1)])
+    
+    def test_names_and_ranges(self):
+        times = fire_times("0 9 * jan,feb mon-fri", datetime(2024, 2, 1, 10, 0), 3)
+        
+        self.assertEqual(times, [
+            datetime(2024, 2, 2, 9, 0),
+            datetime(2024, 2, 5, 9, 0),
+            datetime(2024, 2, 6, 9, 0)
+        ])
+    
+    def test_six_field_seconds(self):
+        times = fire_times("30 */10 * * * *", datetime(2024, 1, 31, 12, 34, 56), 2)
+        
+        self.assertEqual(times, [datetime(2024, 1, 31, 12, 40, 30), datetime(2024, 1, 31, 12, 50, 30)])
+    
+    def test_day_of_month_or_day_of_week(self):
+        times = fire_times("0 0 13 * 5", datetime(2024, 2, 10), 3)
+        
+        self.assertEqual(times, [datetime(2024, 2, 13), datetime(2024, 2, 16), datetime(2024, 2, 23)])
+    
+    def test_leap_day(self):
+        times = fire_times("0 0 29 2 *", datetime(2024, 3, 1), 1)
+        
+        self.assertEqual(times, [datetime(2028, 2, 29)])
+    
+    def test_sunday_as_seven(self):
+        self.assertEqual(CronExpression("0 0 * * 7").days_of_week, CronExpression("0 0 * * 0").days_of_week)
+    
+    def test_impossible_date(self):
+        cron = CronExpression("0 0 30 2 *")
+        
+        self.assertIsNone(cron.next_fire_after(datetime(2024, 1, 1).timestamp()))
+    
+    def test_timezone(self):
+        cron = CronExpression("0 9 * * *", "UTC")
+        start = datetime(2024, 1, 31, 12, 0).timestamp()
+        
+        fire = cron.next_fire_after(start)
+        
+        self.assertEqual(datetime.fromtimestamp(fire, timezone.utc).hour, 9)
+        self.assertEqual(datetime.fromtimestamp(fire, timezone.utc).minute, 0)
+        self.assertLess(fire - start, 86400 + 1)
+    
+    def test_invalid_expressions(self):
+        for expression in ["* * * *", "60 * * * *", "* * * 13 *", "*/0 * * * *", "@reboot", "a b c d e"]:
+            with self.assertRaises(ValueError):
+                CronExpression(expression)
+    
+    def test_unknown_timezone(self):
+        with self.assertRaises(ValueError):
+            CronExpression("* * * * *", "Not/AZone")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
+import os
 import unittest
+import numpy as np
 import sys
 from pathlib import Path
 
@@ -6,6 +8,48 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from smartcron.core.decision import DecisionEngine
 from smartcron.config.parser import JobConfig
+from smartcron.monitor.system_metrics import SystemMonitor
+from smartcron.ai.model import AIPredictor
+
+
+class CountingMonitor(SystemMonitor):
+    
+    def __init__(self):
+        super().__init__()
+        self.samples = 0
+    
+    def get_all_metrics(self):
+        self.samples += 1
+        return {
+            "timestamp": 0,
+            "cpu": {"load_1m": 0.1, "load_5m": 0.1, "load_15m": 0.1, "cpu_percent": 10.0},
+            "memory": {"total_mb": 1024, "available_mb": 512, "used_mb": 512, "percent": 50.0},
+            "battery": None,
+            "disk": {"total_gb": 100, "used_gb": 50, "free_gb": 50, "percent": 50.0},
+            "idle_time_sec": 600
+        }
+
+
+class StubHistory:
+    
+    def __init__(self, stats):
+        self.stats = stats
+        self.lookups = 0
+    
+    def get_job_stats(self, job_name):
+        self.lookups += 1
+        return self.stats.get(job_name)
+
+
+class CountingModel:
+    
+    def __init__(self):
+        self.calls = []
+    
+    def predict_proba(self, features):
+        self.calls.append(features.shape)
+        success = features[:, 6]
+        return np.column_stack([1 - (0.5 + 0.4 * success), 0.5 + 0.4 * success])
 
 
 class TestDecisionEngine(unittest.TestCase):
@@ -55,6 +99,154 @@ class TestDecisionEngine(unittest.TestCase):
         for item in prioritized:
             self.assertIn("job", item)
             self.assertIn("decision", item)
+    
+    def test_prioritize_jobs_samples_metrics_once(self):
+        monitor = CountingMonitor()
+        engine = DecisionEngine(system_monitor=monitor)
+        jobs = [
+            JobConfig({"job_name": f"job_{i}", "command": "true", "max_cpu": 50, "min_idle_time_sec": 60})
+            for i in range(20)
+        ]
+        
+        prioritized = engine.prioritize_jobs(jobs)
+        
+        self.assertEqual(monitor.samples, 1)
+        self.assertEqual(len(prioritized), 20)
+        self.assertTrue(all(item["decision"]["should_run"] for item in prioritized))
+    
+    def test_constraint_failure_reason_uses_snapshot(self):
+        monitor = CountingMonitor()
+        engine = DecisionEngine(system_monitor=monitor)
+        job = JobConfig({"job_name": "busy_job", "command": "true", "max_cpu": 5})
+        snapshot = monitor.snapshot()
+        
+        decision = engine.should_run_job(job, system_metrics=snapshot)
+        
+        self.assertFalse(decision["should_run"])
+        self.assertIn("CPU 10.0% > 5%", decision["reason"])
+        self.assertEqual(monitor.samples, 1)
+    
+    def test_deferred_jobs_become_ready_in_order(self):
+        jobs = {name: JobConfig({"job_name": name, "command": "true"}) for name in ("a", "b", "c")}
+        
+        self.engine.add_deferred_job(jobs["a"], 300)
+        self.engine.add_deferred_job(jobs["b"], 100)
+        self.engine.add_deferred_job(jobs["c"], 200)
+        
+        self.assertEqual(self.engine.next_deferred_time(), 100)
+        self.assertEqual(self.engine.get_ready_deferred_jobs(now=50), [])
+        self.assertEqual([job.job_name for job in self.engine.get_ready_deferred_jobs(now=250)], ["b", "c"])
+        self.assertEqual(self.engine.next_deferred_time(), 300)
+        self.assertEqual(list(self.engine.deferred_jobs), ["a"])
+    
+    def test_clear_and_redefer_use_latest_entry(self):
+        job_a = JobConfig({"job_name": "a", "command": "true"})
+        job_b = JobConfig({"job_name": "b", "command": "true"})
+        
+        self.engine.add_deferred_job(job_a, 100)
+        self.engine.add_deferred_job(job_b, 150)
+        self.engine.clear_deferred_job("a")
+        self.engine.add_deferred_job(job_b, 500)
+        
+        self.assertEqual(self.engine.next_deferred_time(), 500)
+        self.assertEqual(self.engine.get_ready_deferred_jobs(now=400), [])
+        self.assertEqual(self.engine.get_ready_deferred_jobs(now=500), [job_b])
+        self.assertIsNone(self.engine.next_deferred_time())
+    
+    def test_deferred_heap_stays_bounded(self):
+        job = JobConfig({"job_name": "a", "command": "true"})
+        for i in range(1000):
+            self.engine.add_deferred_job(job, 1000 - i)
+        
+        self.assertLess(len(self.engine._deferred_heap), 100)
+        self.assertEqual(self.engine.next_deferred_time(), 1)
+    
+    def test_job_info_uses_cached_history(self):
+        history = StubHistory({
+            "backup": {
+                "ewma_runtime": 900.0,
+                "avg_runtime": 800.0,
+                "p95_runtime": 1200.0,
+                "recent_success_rate": 0.75,
+                "last_success_time": 1000.0
+            }
+        })
+        engine = DecisionEngine(history=history)
+        job = JobConfig({"job_name": "backup", "command": "true"})
+        
+        info = engine.get_job_info(job, now=1100.0)
+        engine.get_job_info(job, now=1200.0)
+        
+        self.assertEqual(info["avg_execution_time"], 900.0)
+        self.assertEqual(info["p95_execution_time"], 1200.0)
+        self.assertAlmostEqual(info["recent_failure_rate"], 0.25)
+        self.assertEqual(info["time_since_last_success"], 100.0)
+        self.assertEqual(history.lookups, 1)
+        
+        engine.invalidate_job_history("backup")
+        engine.get_job_info(job, now=1300.0)
+        self.assertEqual(history.lookups, 2)
+    
+    def test_job_info_defaults_without_history(self):
+        engine = DecisionEngine(history=StubHistory({}))
+        job = JobConfig({"job_name": "new_job", "command": "true"})
+        
+        info = engine.get_job_info(job)
+        
+        self.assertEqual(info["avg_execution_time"], 60)
+        self.assertIsNone(info["time_since_last_success"])
+    
+    def test_prioritize_jobs_batches_ai_predictions(self):
+        predictor = AIPredictor(model_path="/nonexistent/model.pkl", cache_size=0)
+        predictor.model = CountingModel()
+        engine = DecisionEngine(ai_predictor=predictor)
+        
+        jobs = [JobConfig({"job_name": f"ai_{i}", "command": "true", "ai_aware": True}) for i in range(5)]
+        jobs[2].last_run_success = False
+        jobs.append(JobConfig({"job_name": "static", "command": "true"}))
+        
+        prioritized = engine.prioritize_jobs(jobs, system_metrics={"cpu": {}, "memory": {}})
+        decisions = {item["job"].job_name: item["decision"] for item in prioritized}
+        
+        self.assertEqual(predictor.model.calls, [(5, 8)])
+        self.assertTrue(decisions["ai_0"]["should_run"])
+        self.assertFalse(decisions["ai_2"]["should_run"])
+        self.assertAlmostEqual(decisions["ai_2"]["score"], 0.5)
+        self.assertTrue(decisions["static"]["should_run"])
+        self.assertEqual(predictor.predict_batch({}, [{}]), [predictor.predict({}, {})])
+    
+    def test_fallback_avoids_long_job_in_load_spike(self):
+        predictor = AIPredictor(model_path="/nonexistent/model.pkl")
+        load = 2.0 * (os.cpu_count() or 1)
+        metrics = {
+            "cpu": {"cpu_percent": 30.0, "load_1m": load, "load_5m": load / 4},
+            "memory": {"percent": 40.0},
+            "battery": None,
+            "idle_time_sec": 0
+        }
+        
+        short_job = predictor.get_decision_score(metrics, {"avg_execution_time": 30})
+        long_job = predictor.get_decision_score(metrics, {"avg_execution_time": 30, "p95_execution_time": 3600})
+        
+        self.assertEqual(short_job["decision"], "run_now")
+        self.assertNotEqual(long_job["decision"], "run_now")
+        self.assertIn("long job", long_job["reason"])
+    
+    def test_model_path_uses_job_history(self):
+        predictor = AIPredictor(model_path="/nonexistent/model.pkl", cache_size=0)
+        predictor.model = CountingModel()
+        metrics = {"cpu": {}, "memory": {}}
+        
+        baseline, _ = predictor.predict(metrics, {})
+        failing, failing_reason = predictor.predict(metrics, {"recent_failure_rate": 0.75})
+        stale, stale_reason = predictor.predict(metrics, {"time_since_last_success": 2 * 86400})
+        
+        self.assertAlmostEqual(failing, baseline - 0.1)
+        self.assertIn("frequent recent failures", failing_reason)
+        self.assertAlmostEqual(stale, baseline + 0.1)
+        self.assertIn("no success in over a day", stale_reason)
+        self.assertEqual(predictor.predict(metrics, {"recent_failure_rate": 0.25, "time_since_last_success": 60})[0],
+                         baseline)
 
 
 if __name__ == "__main__":
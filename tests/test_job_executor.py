@@ -1,10 +1,16 @@
+import asyncio
 import unittest
+import os
+import shutil
 import sys
+import tempfile
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from smartcron.core.job_executor import JobExecutor
+from smartcron.core.output import BoundedBuffer
 from smartcron.config.parser import JobConfig
 
 
@@ -60,6 +66,174 @@ class TestJobExecutor(unittest.TestCase):
         
         self.assertFalse(result["success"])
         self.assertTrue(result["timed_out"])
+    
+    def test_streaming_output_is_bounded(self):
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        executor = JobExecutor(output_dir=output_dir, output_head_bytes=1024, output_tail_bytes=1024)
+        job = JobConfig({
+            "job_name": "chatty_job",
+            "command": "head -c 1000000 /dev/zero | tr '\\0' a; echo done; echo oops >&2"
+        })
+        
+        result = executor.execute_job(job, {})
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["stdout_bytes"], 1000005)
+        self.assertEqual(result["stderr_bytes"], 5)
+        self.assertTrue(result["output_truncated"])
+        self.assertLess(len(result["stdout"]), 4096)
+        self.assertTrue(result["stdout"].endswith("done\n"))
+        self.assertEqual(os.path.getsize(result["output_path"]), 1000010)
+    
+    def test_run_logs_are_pruned(self):
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        executor = JobExecutor(output_dir=output_dir, keep_run_logs=2)
+        job = JobConfig({"job_name": "pruned_job", "command": "echo hi"})
+        
+        for _ in range(4):
+            executor.execute_job(job, {})
+        
+        self.assertEqual(len(os.listdir(os.path.join(output_dir, "pruned_job"))), 2)
+    
+    def test_hostile_job_names_stay_inside_output_dir(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        output_dir = os.path.join(root, "runs")
+        victim = os.path.join(root, "victim.log")
+        with open(victim, "w") as f:
+            f.write("keep me")
+        executor = JobExecutor(output_dir=output_dir, keep_run_logs=1)
+        
+        for job_name in ("..", "../escape", "a/../../b"):
+            result = executor.execute_job(JobConfig({"job_name": job_name, "command": "echo hi"}), {})
+            path = os.path.realpath(result["output_path"])
+            self.assertEqual(os.path.dirname(os.path.dirname(path)), os.path.realpath(output_dir))
+        
+        self.assertTrue(os.path.exists(victim))
+
+
+class TestBoundedBuffer(unittest.TestCase):
+    
+    def test_keeps_head_and_tail(self):
+        buffer = BoundedBuffer(head_bytes=4, tail_bytes=4)
+        for chunk in (b"abc", b"defgh", b"ijklmn"):
+            buffer.feed(chunk)
+        
+        self.assertEqual(buffer.total_bytes, 14)
+        self.assertTrue(buffer.truncated)
+        self.assertEqual(buffer.getvalue(), b"abcd\n... [6 bytes omitted] ...\nklmn")
+    
+    def test_small_output_is_not_truncated(self):
+        buffer = BoundedBuffer(head_bytes=4, tail_bytes=4)
+        buffer.feed(b"abcdef")
+        
+        self.assertFalse(buffer.truncated)
+        self.assertEqual(buffer.text(), "abcdef")
+
+
+class TestConcurrentJobExecutor(unittest.TestCase):
+    
+    def _wait_for_completion(self, executor, expected, timeout=10):
+        completed = []
+        deadline = time.time() + timeout
+        while len(completed) < expected and time.time() < deadline:
+            completed.extend(executor.collect_completed())
+            time.sleep(0.05)
+        return completed
+    
+    def test_submit_runs_jobs_in_parallel(self):
+        executor = JobExecutor(max_parallel_jobs=3)
+        jobs = [JobConfig({"job_name": f"job_{i}", "command": "sleep 0.5"}) for i in range(3)]
+        
+        start = time.time()
+        for job in jobs:
+            self.assertTrue(executor.submit(job, {}))
+        
+        self.assertEqual(executor.running_count(), 3)
+        self.assertEqual(
+            sorted(entry["name"] for entry in executor.get_running_jobs()),
+            ["job_0", "job_1", "job_2"]
+        )
+        
+        completed = self._wait_for_completion(executor, 3)
+        executor.shutdown()
+        
+        self.assertEqual(len(completed), 3)
+        self.assertTrue(all(result["success"] for _, result in completed))
+        self.assertLess(time.time() - start, 1.4)
+        self.assertEqual(executor.running_count(), 0)
+    
+    def test_global_and_group_limits(self):
+        executor = JobExecutor(max_parallel_jobs=3, group_limits={"backup": 1})
+        backup_a = JobConfig({"job_name": "backup_a", "command": "sleep 0.3", "job_group": "backup"})
+        backup_b = JobConfig({"job_name": "backup_b", "command": "sleep 0.3", "job_group": "backup"})
+        other = JobConfig({"job_name": "other", "command": "sleep 0.3"})
+        
+        self.assertTrue(executor.submit(backup_a, {}))
+        self.assertFalse(executor.submit(backup_a, {}))
+        self.assertFalse(executor.submit(backup_b, {}))
+        self.assertTrue(executor.submit(other, {}))
+        self.assertEqual(executor.running_count("backup"), 1)
+        
+        self._wait_for_completion(executor, 2)
+        self.assertTrue(executor.submit(backup_b, {}))
+        self._wait_for_completion(executor, 1)
+        executor.shutdown()
+
+
+class TestAsyncJobExecutor(unittest.TestCase):
+    
+    def test_execute_job_async(self):
+        executor = JobExecutor()
+        job = JobConfig({"job_name": "async_job", "command": "echo 'Hello Async'"})
+        
+        result = asyncio.run(executor.execute_job_async(job, {}))
+        
+        self.assertTrue(result["success"])
+        self.assertIn("Hello Async", result["stdout"])
+        self.assertTrue(job.last_run_success)
+    
+    def test_execute_job_async_timeout(self):
+        executor = JobExecutor()
+        job = JobConfig({"job_name": "async_timeout", "command": "sleep 10", "timeout_sec": 0.5})
+        
+        result = asyncio.run(executor.execute_job_async(job, {}))
+        
+        self.assertFalse(result["success"])
+        self.assertTrue(result["timed_out"])
+    
+    def test_execute_job_async_keeps_partial_output_on_timeout(self):
+        executor = JobExecutor(output_head_bytes=16, output_tail_bytes=16)
+        job = JobConfig({
+            "job_name": "async_partial",
+            "command": "head -c 100000 /dev/zero | tr '\\0' a; sleep 10",
+            "timeout_sec": 0.5
+        })
+        
+        result = asyncio.run(executor.execute_job_async(job, {}))
+        
+        self.assertTrue(result["timed_out"])
+        self.assertEqual(result["stdout_bytes"], 100000)
+        self.assertTrue(result["output_truncated"])
+        self.assertTrue(result["stdout"].startswith("a" * 16))
+    
+    def test_submit_async_tracks_running_jobs(self):
+        executor = JobExecutor()
+        jobs = [JobConfig({"job_name": f"async_{i}", "command": "sleep 0.2"}) for i in range(50)]
+        
+        async def run_all():
+            tasks = [executor.submit_async(job, {}) for job in jobs]
+            self.assertEqual(executor.running_count(), 50)
+            await asyncio.gather(*tasks)
+            return executor.collect_completed()
+        
+        completed = asyncio.run(run_all())
+        
+        self.assertEqual(len(completed), 50)
+        self.assertTrue(all(result["success"] for _, result in completed))
+        self.assertEqual(executor.running_jobs, {})
 
 
 if __name__ == "__main__":
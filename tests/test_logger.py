@@ -0,0 +1,235 @@
+import unittest
+import tempfile
+import sqlite3
+import shutil
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from smartcron.utils.logger import SmartCronLogger, migrate, get_schema_version, decode_output, SCHEMA_VERSION
+
+
+class TestSmartCronLogger(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "logs.db")
+        self.logger = SmartCronLogger(
+            db_path=self.db_path,
+            log_dir=os.path.join(self.temp_dir, "logs"),
+            flush_interval=60
+        )
+    
+    def tearDown(self):
+        self.logger.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def _log(self, job_name, exit_code=0, duration=1.0):
+        self.logger.log_job_execution(job_name, 100.0, 100.0 + duration, exit_code, "out", "", {})
+    
+    def _row_count(self, table):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+    
+    def test_wal_mode(self):
+        conn = sqlite3.connect(self.db_path)
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+        
+        self.assertEqual(mode, "wal")
+    
+    def test_writes_are_batched_until_flush(self):
+        for _ in range(5):
+            self._log("batched_job")
+        self.logger.log_system_snapshot({"timestamp": 1.0, "cpu": {"cpu_percent": 10}})
+        
+        self.assertEqual(self._row_count("job_executions"), 0)
+        
+        self.assertGreater(self.logger.flush(), 0)
+        self.assertEqual(self._row_count("job_executions"), 5)
+        self.assertEqual(self._row_count("system_snapshots"), 1)
+        self.assertEqual(self.logger.flush(), 0)
+    
+    def test_reads_see_pending_writes(self):
+        self._log("read_job", exit_code=0, duration=2.0)
+        self._log("read_job", exit_code=1, duration=4.0)
+        
+        history = self.logger.get_job_history("read_job")
+        
+        self.assertEqual(len(history), 2)
+        self.assertEqual(self.logger.get_job_success_rate("read_job"), 0.5)
+        self.assertAlmostEqual(self.logger.get_average_execution_time("read_job"), 2.4)
+    
+    def test_reads_from_multiple_threads(self):
+        self._log("threaded_job")
+        results = []
+        
+        def read():
+            results.append(len(self.logger.get_job_history("threaded_job")))
+        
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(results, [1, 1, 1, 1])
+    
+    def test_output_is_deduplicated(self):
+        for _ in range(3):
+            self.logger.log_job_execution("output_job", 100.0, 101.0, 0, "same output", "", {})
+        self.logger.log_job_execution("output_job", 102.0, 103.0, 1, "other output", "boom", {})
+        
+        history = self.logger.get_job_history("output_job")
+        
+        self.assertEqual(self._row_count("job_outputs"), 3)
+        self.assertEqual(history[0]["stdout"], "other output")
+        self.assertEqual(history[0]["stderr"], "boom")
+        self.assertEqual(history[1]["stdout"], "same output")
+        self.assertIsNone(history[1]["stderr"])
+    
+    def test_history_without_output(self):
+        self._log("narrow_job")
+        
+        history = self.logger.get_job_history("narrow_job", include_output=False)
+        
+        self.assertIsNone(history[0]["stdout"])
+        self.assertIsNotNone(history[0]["stdout_hash"])
+    
+    def test_output_is_capped(self):
+        self.logger.max_output_bytes = 100
+        self.logger.log_job_execution("big_job", 100.0, 101.0, 0, "a" * 500 + "b" * 500, "", {})
+        
+        stdout = self.logger.get_job_history("big_job")[0]["stdout"]
+        
+        self.assertTrue(stdout.startswith("a" * 50))
+        self.assertTrue(stdout.endswith("b" * 50))
+        self.assertIn("900 bytes truncated", stdout)
+    
+    def test_job_stats_are_maintained(self):
+        for exit_code, duration in [(0, 1.0), (0, 2.0), (1, 3.0), (1, 10.0)]:
+            self._log("stats_job", exit_code=exit_code, duration=duration)
+        
+        stats = self.logger.get_job_stats("stats_job")
+        
+        self.assertEqual(stats["total_runs"], 4)
+        self.assertEqual(stats["success_count"], 2)
+        self.assertEqual(stats["failure_streak"], 2)
+        self.assertEqual(stats["recent_outcomes"], [False, False, True, True])
+        self.assertEqual(stats["success_rate"], 0.5)
+        self.assertAlmostEqual(stats["avg_runtime"], 4.0)
+        self.assertEqual(stats["max_runtime"], 10.0)
+        self.assertAlmostEqual(stats["p50_runtime"], 2.0, delta=0.1)
+        self.assertAlmostEqual(stats["p95_runtime"], 10.0, delta=0.5)
+        self.assertIsNone(self.logger.get_job_stats("unknown_job"))
+    
+    def test_summary_reads_agree_with_job_stats(self):
+        for exit_code, duration in [(1, 8.0)] * 5 + [(0, 1.0), (1, 2.0), (0, 3.0)]:
+            self._log("summary_job", exit_code=exit_code, duration=duration)
+        
+        stats = self.logger.get_job_stats("summary_job")
+        
+        self.assertEqual(self.logger.get_job_success_rate("summary_job"), stats["recent_success_rate"])
+        self.assertAlmostEqual(self.logger.get_job_success_rate("summary_job", last_n=3), 2 / 3)
+        self.assertEqual(self.logger.get_average_execution_time("summary_job"), stats["ewma_runtime"])
+        self.assertEqual(self.logger.get_job_success_rate("unknown_job"), 1.0)
+        self.assertEqual(self.logger.get_average_execution_time("unknown_job"), 0.0)
+        self.assertEqual(self._row_count("job_executions"), 0)
+    
+    def test_job_stats_persist(self):
+        self._log("persisted_job", exit_code=0, duration=5.0)
+        self.logger.close()
+        
+        reopened = SmartCronLogger(db_path=self.db_path, log_dir=os.path.join(self.temp_dir, "logs"))
+        self.addCleanup(reopened.close)
+        stats = reopened.get_job_stats("persisted_job")
+        
+        self.assertEqual(stats["total_runs"], 1)
+        self.assertEqual(stats["success_streak"], 1)
+        self.assertAlmostEqual(stats["p50_runtime"], 5.0, delta=0.25)
+    
+    def test_close_flushes_pending_writes(self):
+        self._log("closing_job")
+        self.logger.close()
+        
+        self.assertEqual(self._row_count("job_executions"), 1)
+    
+    def test_max_batch_triggers_background_flush(self):
+        self.logger.max_batch = 3
+        for _ in range(3):
+            self._log("busy_job")
+        
+        for _ in range(100):
+            if self._row_count("job_executions"):
+                break
+            time.sleep(0.05)
+        
+        self.assertGreater(self._row_count("job_executions"), 0)
+
+
+class TestMigrations(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "logs.db")
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_fresh_database(self):
+        conn = sqlite3.connect(self.db_path)
+        
+        self.assertEqual(migrate(conn), SCHEMA_VERSION)
+        self.assertEqual(get_schema_version(conn), SCHEMA_VERSION)
+        self.assertEqual(migrate(conn), SCHEMA_VERSION)
+        conn.close()
+    
+    def test_upgrades_unversioned_database(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE job_executions (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "job_name TEXT NOT NULL, start_time REAL NOT NULL, end_time REAL, exit_code INTEGER, "
+                     "stdout TEXT, stderr TEXT, execution_time_sec REAL, system_state TEXT, "
+                     "ai_decision_reason TEXT, success BOOLEAN, timestamp TEXT)")
+        conn.execute("INSERT INTO job_executions (job_name, start_time, success, stdout, system_state) "
+                     "VALUES ('old_job', 1.0, 1, 'legacy output', '{\"cpu\": {\"cpu_percent\": 42}}')")
+        conn.commit()
+        
+        migrate(conn)
+        
+        plan = " ".join(str(row) for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT success, execution_time_sec FROM job_executions "
+            "WHERE job_name = ? ORDER BY start_time DESC LIMIT 10", ("old_job",)
+        ))
+        count = conn.execute("SELECT COUNT(*) FROM job_executions").fetchone()[0]
+        row = conn.execute("SELECT stdout, stdout_hash FROM job_executions").fetchone()
+        output = conn.execute("SELECT data FROM job_outputs WHERE hash = ?", (row[1],)).fetchone()
+        stats = conn.execute("SELECT total_runs, success_count FROM job_stats WHERE job_name = 'old_job'").fetchone()
+        features = conn.execute("SELECT cpu_percent, battery_level, is_charging FROM job_executions").fetchone()
+        conn.close()
+        
+        self.assertIn("idx_job_executions_job_start", plan)
+        self.assertIn("COVERING INDEX", plan)
+        self.assertEqual(count, 1)
+        self.assertIsNone(row[0])
+        self.assertEqual(decode_output(output[0]), "legacy output")
+        self.assertEqual(stats, (1, 1))
+        self.assertEqual(features, (42, 100, 1))
+    
+    def test_rejects_newer_schema(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+        
+        with self.assertRaises(RuntimeError):
+            migrate(conn)
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
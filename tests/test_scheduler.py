@@ -0,0 +1,93 @@
+import unittest
+import tempfile
+import shutil
+import os
+import io
+import signal
+import sys
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from smartcron.config.parser import JobConfig
+from smartcron.core.scheduler import SmartCronScheduler, main
+
+
+class TestSmartCronScheduler(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGINT, signal.SIGTERM)}
+        self.clock = 1700000000.0
+        patcher = mock.patch("time.time", lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def tearDown(self):
+        for signum, handler in self.handlers.items():
+            signal.signal(signum, handler)
+        shutil.rmtree(self.temp_dir)
+    
+    def _scheduler(self, **kwargs) -> SmartCronScheduler:
+        scheduler = SmartCronScheduler(
+            config_dir=os.path.join(self.temp_dir, "jobs"),
+            model_path=os.path.join(self.temp_dir, "models", "model.pkl"),
+            db_path=os.path.join(self.temp_dir, "logs.db"),
+            log_dir=os.path.join(self.temp_dir, "logs"),
+            **kwargs
+        )
+        self.addCleanup(self._close, scheduler)
+        return scheduler
+    
+    @staticmethod
+    def _close(scheduler: SmartCronScheduler):
+        scheduler.logger.close()
+        for handler in list(scheduler.logger.logger.handlers):
+            scheduler.logger.logger.removeHandler(handler)
+            handler.close()
+    
+    def test_frequent_cron_job_does_not_add_full_ticks(self):
+        scheduler = self._scheduler(check_interval=60)
+        scheduler.system_monitor.snapshot = lambda: {"timestamp": self.clock}
+        
+        runs = {"plain": [], "frequent": []}
+        
+        def execute(job, system_metrics):
+            runs[job.job_name].append(self.clock)
+            return {"success": True}
+        
+        scheduler.job_executor.execute_with_retry = execute
+        scheduler.jobs = [
+            JobConfig({"job_name": "plain", "command": "true"}),
+            JobConfig({"job_name": "frequent", "command": "true", "schedule": "*/3 * * * * *"})
+        ]
+        scheduler._config_signature = scheduler.job_parser.config_signature()
+        scheduler.last_job_load_time = self.clock
+        scheduler._index_jobs(self.clock)
+        
+        end = self.clock + 299
+        next_tick = 0.0
+        while self.clock < end:
+            full_tick = self.clock >= next_tick
+            scheduler.process_jobs(full_tick)
+            next_tick = scheduler._after_tick(full_tick, next_tick)
+            self.clock += max(scheduler._seconds_until_next_wakeup(next_tick), 0.001)
+        
+        self.assertEqual(len(runs["plain"]), 5)
+        self.assertEqual([b - a for a, b in zip(runs["plain"], runs["plain"][1:])], [60.0] * 4)
+        self.assertGreaterEqual(len(runs["frequent"]), 95)
+    
+    def test_group_limit_requires_concurrency(self):
+        argv = ["smartcron", "--config-dir", self.temp_dir, "--group-limit", "io=1"]
+        
+        with mock.patch.object(sys, "argv", argv), mock.patch("sys.stderr", io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit) as raised:
+                main()
+        
+        self.assertEqual(raised.exception.code, 2)
+        self.assertIn("--group-limit requires --max-parallel", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
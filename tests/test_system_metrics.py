@@ -1,10 +1,20 @@
 import unittest
+import tempfile
+import os
 import sys
+import time
+from array import array
 from pathlib import Path
+from unittest import mock
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from smartcron.monitor.system_metrics import SystemMonitor
+from smartcron.monitor.sampler import MetricsRingBuffer, MetricsSampler, RECORD_FIELDS
+from smartcron.monitor.cpu import CpuAccounting
+from smartcron.monitor.idle import (
+    IdleTimeDetector, IdleTimeProvider, UtmpIdleProvider, UTMP_RECORD, USER_PROCESS
+)
 
 
 class TestSystemMonitor(unittest.TestCase):
@@ -59,6 +69,205 @@ class TestSystemMonitor(unittest.TestCase):
         
         result = self.monitor.check_constraints(constraints)
         self.assertIsInstance(result, bool)
+    
+    def test_snapshot_is_immutable(self):
+        snapshot = self.monitor.snapshot()
+        
+        self.assertIn("cpu", snapshot)
+        with self.assertRaises(TypeError):
+            snapshot["cpu"] = {}
+        with self.assertRaises(TypeError):
+            snapshot["cpu"]["cpu_percent"] = 0
+    
+    def test_check_constraints_with_snapshot(self):
+        snapshot = self.monitor.snapshot()
+        
+        self.assertTrue(self.monitor.check_constraints({"max_cpu": 101}, snapshot))
+        self.assertFalse(self.monitor.check_constraints({"min_disk_free_gb": 10 ** 9}, snapshot))
+    
+    def test_background_sampler(self):
+        monitor = SystemMonitor(sampler_interval=0.05)
+        monitor.start_sampler()
+        try:
+            metrics = monitor.get_all_metrics()
+            
+            self.assertIsNotNone(metrics["cpu"]["cpu_percent_avg"])
+            self.assertGreaterEqual(metrics["cpu"]["cpu_percent"], 0)
+            self.assertLessEqual(metrics["cpu"]["cpu_percent"], 100)
+            self.assertGreater(metrics["memory"]["total_mb"], 0)
+            self.assertGreater(metrics["disk"]["total_gb"], 0)
+        finally:
+            monitor.stop_sampler()
+        
+        self.assertFalse(monitor.sampler.is_running())
+
+
+class TestMetricsRingBuffer(unittest.TestCase):
+    
+    def _record(self, timestamp, cpu_percent):
+        record = [0.0] * len(RECORD_FIELDS)
+        record[0] = timestamp
+        record[1] = cpu_percent
+        return record
+    
+    def test_latest_and_wraparound(self):
+        buffer = MetricsRingBuffer(capacity=4)
+        self.assertIsNone(buffer.latest())
+        
+        for i in range(10):
+            buffer.append(self._record(float(i), float(i * 10)))
+        
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer.latest()["timestamp"], 9.0)
+        self.assertEqual(buffer.latest()["cpu_percent"], 90.0)
+    
+    def test_window_mean(self):
+        buffer = MetricsRingBuffer(capacity=100)
+        for i in range(10):
+            buffer.append(self._record(float(i), float(i * 10)))
+        
+        self.assertAlmostEqual(buffer.mean("cpu_percent", window_sec=2, now=9.0), 80.0)
+        self.assertIsNone(buffer.mean("cpu_percent", window_sec=2, now=100.0))
+    
+    def test_full_buffer_returns_every_record(self):
+        for capacity in (1, 4):
+            buffer = MetricsRingBuffer(capacity=capacity)
+            for i in range(10):
+                buffer.append(self._record(float(i), float(i * 10)))
+            
+            self.assertEqual([record[0] for record in buffer.records()], [float(i) for i in range(10 - capacity, 10)])
+            self.assertAlmostEqual(buffer.mean("cpu_percent", window_sec=60), 90.0 - 5.0 * (capacity - 1))
+    
+    def test_drops_records_overwritten_during_read(self):
+        buffer = MetricsRingBuffer(capacity=4)
+        for i in range(6):
+            buffer.append(self._record(float(i), 0.0))
+        
+        class RacingData(array):
+            
+            def __getitem__(self, index):
+                if self.pending is not None:
+                    pending, self.pending = self.pending, None
+                    buffer.append(pending)
+                return array.__getitem__(self, index)
+        
+        racing = RacingData('d', buffer._data)
+        racing.pending = self._record(6.0, 0.0)
+        buffer._data = racing
+        
+        self.assertEqual([r[0] for r in buffer.records()], [3.0, 4.0, 5.0])
+
+
+class TestCpuAccounting(unittest.TestCase):
+    
+    def setUp(self):
+        fd, self.stat_path = tempfile.mkstemp()
+        os.close(fd)
+    
+    def tearDown(self):
+        os.remove(self.stat_path)
+    
+    def _write_stat(self, lines):
+        with open(self.stat_path, 'w') as f:
+            f.write("\n".join(lines) + "\nintr 0\n")
+    
+    def test_delta_utilisation(self):
+        accounting = CpuAccounting(stat_path=self.stat_path)
+        
+        self._write_stat([
+            "cpu  100 0 100 700 50 0 0 50 0 0",
+            "cpu0 50 0 50 350 25 0 0 25 0 0",
+            "cpu1 50 0 50 350 25 0 0 25 0 0"
+        ])
+        accounting.prime()
+        
+        self._write_stat([
+            "cpu  160 0 120 780 70 0 0 70 0 0",
+            "cpu0 110 0 70 360 35 0 0 25 0 0",
+            "cpu1 50 0 50 420 35 0 0 45 0 0"
+        ])
+        usage = accounting.sample()
+        
+        self.assertAlmostEqual(usage["cpu_percent"], 50.0)
+        self.assertAlmostEqual(usage["iowait_percent"], 10.0)
+        self.assertAlmostEqual(usage["steal_percent"], 10.0)
+        self.assertAlmostEqual(usage["per_core_percent"][0], 80.0)
+        self.assertAlmostEqual(usage["per_core_percent"][1], 20.0)
+        
+        self.assertEqual(accounting.sample(), usage)
+    
+    def test_sampler_starts_from_primed_accounting(self):
+        monitor = SystemMonitor(sampler_interval=1, cpu_mode="delta")
+        self.assertIs(monitor.sampler.cpu_accounting, monitor.cpu_accounting)
+        
+        self._write_stat(["cpu  100 0 100 700 50 0 0 50 0 0"])
+        with mock.patch("smartcron.monitor.sampler.CpuAccounting",
+                        lambda: CpuAccounting(stat_path=self.stat_path)):
+            sampler = MetricsSampler(interval=1)
+        self._write_stat(["cpu  110 0 100 710 50 0 0 50 0 0"])
+        
+        self.assertAlmostEqual(sampler.cpu_accounting.sample()["cpu_percent"], 50.0)
+
+
+class StaticIdleProvider(IdleTimeProvider):
+    
+    def __init__(self, is_available, idle):
+        self.is_available = is_available
+        self.idle = idle
+        self.probes = 0
+    
+    def available(self):
+        self.probes += 1
+        return self.is_available
+    
+    def get_idle_seconds(self):
+        return self.idle
+
+
+class TestIdleTimeDetector(unittest.TestCase):
+    
+    def test_caches_first_available_provider(self):
+        missing = StaticIdleProvider(False, None)
+        working = StaticIdleProvider(True, 42.7)
+        detector = IdleTimeDetector(providers=[missing, working])
+        
+        self.assertEqual(detector.get_idle_seconds(), 42)
+        self.assertEqual(detector.get_idle_seconds(), 42)
+        self.assertIs(detector.provider, working)
+        self.assertEqual(missing.probes, 1)
+        self.assertEqual(working.probes, 1)
+    
+    def test_no_provider(self):
+        detector = IdleTimeDetector(providers=[StaticIdleProvider(False, None)])
+        self.assertIsNone(detector.get_idle_seconds())
+    
+    def test_provider_base_is_abstract(self):
+        with self.assertRaises(TypeError):
+            IdleTimeProvider()
+    
+    def test_utmp_provider_uses_tty_atime(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tty_path = os.path.join(temp_dir, "pts1")
+            open(tty_path, 'w').close()
+            atime = time.time() - 120
+            os.utime(tty_path, (atime, atime))
+            
+            utmp_path = os.path.join(temp_dir, "utmp")
+            with open(utmp_path, 'wb') as f:
+                f.write(UTMP_RECORD.pack(USER_PROCESS, 1234, b"pts1", b"ts/1", b"user", b"",
+                                         0, 0, 0, 0, 0, 0, 0, 0, 0, b""))
+                f.write(UTMP_RECORD.pack(1, 0, b"~", b"~~", b"reboot", b"",
+                                         0, 0, 0, 0, 0, 0, 0, 0, 0, b""))
+            
+            provider = UtmpIdleProvider(utmp_path=utmp_path, dev_dir=temp_dir)
+            
+            self.assertTrue(provider.available())
+            self.assertEqual(provider.session_lines(), ["pts1"])
+            self.assertAlmostEqual(provider.get_idle_seconds(), 120, delta=5)
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
 
 if __name__ == "__main__":